@@ -1,14 +1,130 @@
 #app.py
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, Response, g, render_template, request, jsonify, send_file, abort
+import json
 import logging
 import os
-from process_ecology import process, u_list
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from artifact_store import ArtifactStore
+from cache import ImageCache, ResultCache, cache_key
+from calibration import calibrate
+import data_formats
+from functions import DisturbanceTable
+from jobs import JobQueue, DONE
+from metrics import (IMPORT_SECONDS, REGISTRY, collect, count_solve, observe_stages, profiled, server_timing,
+                     start_collect, stop_collect, timings_ms)
+import numpy as np
+from monte_carlo import monte_carlo
+from optimization import optimize
+from process_ecology import (artifact_hash, build_artifacts, cached_process, create_band_graphic, create_sweep_graphic,
+                             create_tornado_graphic, parse_grid, parse_scenario, render_png, result_arrays,
+                             render_images, scenario_summary, start_render_pool, sweep_time, u_list,
+                             warmup)
+from sensitivity import local_sensitivity
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-here'
 
 os.makedirs('static/images', exist_ok=True)
 
+# Кэш результатов /draw_graphics: 64 МБ в памяти, 512 МБ на диске
+result_cache = ResultCache('./cache', memory_bytes=64 * 2**20, disk_bytes=512 * 2**20)
+
+# Картинки /draw_graphics по хэшу входных данных: 64 МБ в памяти и 256 МБ на диске,
+# общем для всех процессов сервера (/images/<хэш>.png отдает любой из них)
+image_cache = ImageCache(max_bytes=64 * 2**20, directory='./cache/images', disk_bytes=256 * 2**20)
+
+# Картинки расчетов (/sweep): каталог на расчет, 256 МБ, хранятся сутки с последнего обращения
+artifact_store = ArtifactStore('./artifacts', quota_bytes=256 * 2**20, ttl_seconds=24 * 3600)
+
+# Фоновые расчеты /draw_graphics (JOB_WORKERS потоков). Рендер в процессе идет
+# по одному под общей блокировкой (process_ecology.renders), поэтому дополнительные
+# потоки ускоряют только расчеты; для параллельного рендера - RENDER_WORKERS.
+# Состояние заданий пишется в ./cache/jobs: /jobs/<id> отвечает любой процесс сервера
+job_queue = JobQueue(workers=int(os.environ.get('JOB_WORKERS', '1')), directory='./cache/jobs')
+
+# Число процессов для параллельного рендера картинок (0 - рендер в потоке запроса)
+RENDER_WORKERS = int(os.environ.get('RENDER_WORKERS', '0'))
+
+# Поверхность /sweep: не больше MAX_SWEEP_T значений t и MAX_SWEEP_NODES узлов (t, C) в ответе
+MAX_SWEEP_T = 200
+MAX_SWEEP_NODES = 100000
+
+# Пакетные расчеты /batch: процессы пула и предел числа сценариев в одном запросе
+BATCH_WORKERS = int(os.environ.get('BATCH_WORKERS', str(min(4, os.cpu_count() or 1))))
+MAX_BATCH = 1000
+_batch_pool = None
+_batch_pool_lock = threading.Lock()
+
+def batch_pool():
+    """Пул процессов /batch, создается при первом пакете"""
+    global _batch_pool
+    with _batch_pool_lock:
+        if _batch_pool is None:
+            _batch_pool = ProcessPoolExecutor(max_workers=BATCH_WORKERS)
+        return _batch_pool
+
+# Прогрев при запуске (WARMUP): sync - до приема запросов (импорт app ждет прогрева),
+# background - в фоновом потоке, /healthz отвечает сразу
+WARMUP = os.environ.get('WARMUP', '')
+warm = threading.Event()
+
+def run_warmup():
+    try:
+        logging.info(f"Прогрев: {warmup():.2f} с, импорт модулей: "
+                     + ", ".join(f"{name} {seconds:.2f} с" for name, seconds in IMPORT_SECONDS.items()))
+        warm.set()
+    except Exception as e:
+        logging.error(f"Error in warmup: {e}")
+
+def start_warmup(mode=WARMUP):
+    if mode == "sync":
+        run_warmup()
+    elif mode == "background":
+        threading.Thread(target=run_warmup, name="warmup", daemon=True).start()
+
+# Каталог для профилей cProfile; если задан, "profile": true в /draw_graphics сохраняет профиль расчета
+PROFILE_DIR = os.environ.get('PROFILE_DIR')
+
+@app.before_request
+def start_timing():
+    g.start = time.perf_counter()
+    g.timings_token, g.timings = start_collect()
+
+@app.after_request
+def add_timing(response):
+    """Этапы запроса в заголовке Server-Timing и длительность в гистограмме /metrics"""
+    if "start" not in g:
+        return response
+    total = time.perf_counter() - g.start
+    # Потоковый ответ (timed_stream) учитывается, когда отдана последняя строка
+    if not g.get("streamed"):
+        REGISTRY.observe("ecology_request_seconds", {"endpoint": request.endpoint or "unknown"}, total)
+    response.headers['Server-Timing'] = server_timing(g.timings, total)
+    return response
+
+def timed_stream(lines):
+    """
+    Ответ NDJSON из генератора строк: длительность запроса в /metrics -
+    от начала запроса до последней строки, а не до возврата из обработчика
+    """
+    start, endpoint = g.start, request.endpoint or "unknown"
+    g.streamed = True
+
+    def generate():
+        try:
+            yield from lines
+        finally:
+            REGISTRY.observe("ecology_request_seconds", {"endpoint": endpoint}, time.perf_counter() - start)
+
+    return Response(generate(), mimetype='application/x-ndjson')
+
+@app.teardown_request
+def stop_timing(exc):
+    if "timings_token" in g:
+        stop_collect(g.pop("timings_token"))
+
 @app.route('/')
 def main():
     return render_template('index.html',
@@ -48,26 +164,412 @@ def main():
 def get_initial_equations():
     return jsonify(u_list)
 
+def draw_job(data):
+    """Расчет и рендер для /draw_graphics (выполняется в очереди заданий)"""
+    time_value = data.get("time_value", "0.0")
+    profile_path = None
+    with collect() as timings:
+        if PROFILE_DIR and data.get("profile"):
+            with profiled(PROFILE_DIR, "draw_graphics") as profile_path:
+                stats, cached, urls = _draw(data, time_value)
+        else:
+            stats, cached, urls = _draw(data, time_value)
+    solver_stats = {name: value for name, value in stats.items() if name != "crossings"}
+    result = {"time_used": time_value, "solver_stats": solver_stats, "crossings": stats.get("crossings"),
+              "cached": cached, "artifacts": urls, "timings": timings_ms(timings)}
+    if profile_path is not None:
+        result["profile"] = profile_path
+    return result
+
+def _draw(data, time_value):
+    return cached_process(
+        result_cache,
+        image_cache,
+        data["initial_equations"], 
+        data["faks"], 
+        data["equations"], 
+        data["restrictions"],
+        time_value,
+        solver=data.get("solver", "odeint"),
+        rtol=data.get("rtol"),
+        atol=data.get("atol"),
+        grid=data.get("grid")
+    )
+
 @app.route('/draw_graphics', methods=['POST'])
 def draw_graphics():
     try:
         data = request.get_json()
-        
-        time_value = data.get("time_value", "0.0")
-        
-        process(
-            data["initial_equations"], 
-            data["faks"], 
-            data["equations"], 
+        for key in ("initial_equations", "faks", "equations", "restrictions"):
+            if key not in data:
+                raise KeyError(key)
+        parse_grid(data.get("grid"))
+
+        job_id = job_queue.submit(draw_job, data)
+        return jsonify({"status": "В очереди", "job_id": job_id, "job_url": f"/jobs/{job_id}"})
+    except Exception as e:
+        logging.error(f"Error in draw_graphics: {e}")
+        return jsonify({"status": "Ошибка"})
+
+@app.route('/jobs/<job_id>')
+def get_job(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"status": "Ошибка", "error": "Задание не найдено"}), 404
+
+    response = {
+        "job_id": job_id,
+        "state": job["status"],
+        "status": {"queued": "В очереди", "running": "Выполняется",
+                   "done": "Выполнено", "error": "Ошибка"}[job["status"]],
+    }
+    if job["status"] == DONE:
+        response.update(job["result"])
+        response["seconds"] = job["finished"] - job["submitted"]
+        # Этапы фонового расчета попадают в Server-Timing ответа с результатом
+        g.timings.extend((name, ms / 1000) for name, ms in job["result"].get("timings", {}).items())
+    elif job["error"]:
+        response["error"] = job["error"]
+    return jsonify(response)
+
+@app.route('/data', methods=['POST'])
+def get_data():
+    """
+    Числовые результаты расчета без картинок (параметры как у /draw_graphics).
+    format: json (по умолчанию), f32 - float32 little-endian подряд, раскладка
+    в заголовке X-Data-Layout, npz - архив numpy
+    """
+    try:
+        data = request.get_json()
+        fmt = data.get("format", request.args.get("format", "json"))
+        if fmt not in data_formats.FORMATS:
+            raise ValueError(f"Неизвестный формат: {fmt}")
+
+        arrays = result_arrays(
+            result_cache,
+            data["initial_equations"],
+            data["faks"],
+            data["equations"],
             data["restrictions"],
-            time_value
+            data.get("time_value", "0.0"),
+            solver=data.get("solver", "odeint"),
+            rtol=data.get("rtol"),
+            atol=data.get("atol"),
+            grid=data.get("grid"),
+            weights=data.get("weights")
         )
-        
-        return jsonify({"status": "Выполнено", "time_used": time_value})
+
+        if fmt == "f32":
+            return Response(data_formats.to_f32(arrays), mimetype="application/octet-stream",
+                            headers={"X-Data-Layout": data_formats.layout_header(arrays)})
+        if fmt == "npz":
+            return Response(data_formats.to_npz(arrays), mimetype="application/octet-stream",
+                            headers={"Content-Disposition": "attachment; filename=result.npz"})
+        return jsonify({"status": "Выполнено", **data_formats.to_json(arrays)})
     except Exception as e:
-        logging.error(f"Error in draw_graphics: {e}")
+        logging.error(f"Error in data: {e}")
+        return jsonify({"status": "Ошибка"})
+
+@app.route('/sweep', methods=['POST'])
+def sweep():
+    """
+    Поверхность Cf1-Cf5 по (t, C) за один пакетный расчет.
+    t задается списком t_values или сеткой t_start, t_stop, t_count (не больше MAX_SWEEP_T),
+    сетка C - равномерная из grid (parse_grid)
+    """
+    try:
+        data = request.get_json()
+        initial_equations, faks, equations, _, _ = parse_scenario(data)
+        if "t_values" in data:
+            if len(data["t_values"]) > MAX_SWEEP_T:
+                raise ValueError(f"Значений t должно быть не больше {MAX_SWEEP_T}")
+            t_values = np.array([float(t) for t in data["t_values"]])
+        else:
+            t_values = np.linspace(float(data.get("t_start", 0.0)), float(data.get("t_stop", 1.0)),
+                                   min(int(data.get("t_count", 21)), MAX_SWEEP_T))
+        grid = parse_grid(data.get("grid"))
+        if len(t_values) * grid["points"] > MAX_SWEEP_NODES:
+            raise ValueError(f"Узлов (t, C) должно быть не больше {MAX_SWEEP_NODES}")
+        C = np.linspace(0, 1, grid["points"])
+
+        surface = sweep_time(initial_equations, faks, equations, t_values, C)
+        run_id = cache_key({"sweep": [initial_equations, faks, equations, t_values.tolist(), len(C)]})[:32]
+        create_sweep_graphic(t_values, C, surface,
+                             os.path.join(artifact_store.run_dir(run_id), 'sweep_eco.png'))
+        artifact_store.evict(keep={run_id})
+
+        return jsonify({
+            "status": "Выполнено",
+            "t": t_values.tolist(),
+            "C": C.tolist(),
+            "surface": surface.tolist(),
+            "image": artifact_store.url(run_id, 'sweep_eco.png')
+        })
+    except Exception as e:
+        logging.error(f"Error in sweep: {e}")
+        return jsonify({"status": "Ошибка"})
+
+def json_values(array):
+    """Массив в списки для JSON: NaN (ограничение не достигнуто) - null"""
+    array = np.asarray(array, dtype=float)
+    return np.where(np.isnan(array), None, array).tolist()
+
+@app.route('/sensitivity', methods=['POST'])
+def sensitivity():
+    """
+    Чувствительность Cf1-Cf5 при C=1 и точек достижения ограничений ко всем
+    параметрам faks и equations (или к списку parameters) за один пакетный расчет
+    """
+    try:
+        data = request.get_json()
+        initial_equations, faks, equations, restrictions, time_value = parse_scenario(data)
+        result = local_sensitivity(initial_equations, faks, equations, restrictions, time_value,
+                                   rel_step=float(data.get("rel_step", 1e-3)),
+                                   names=data.get("parameters"))
+
+        args = (result["names"], result["scaled"], int(data.get("top", 15)))
+        digest = artifact_hash(create_tornado_graphic, args)
+        if digest not in image_cache:
+            image_cache.put(digest, render_png(create_tornado_graphic, args))
+
+        return jsonify({
+            "status": "Выполнено",
+            "parameters": result["names"],
+            "values": result["values"].tolist(),
+            "outputs": result["outputs"],
+            "base": json_values(result["base"]),
+            "sensitivity": json_values(result["sensitivity"]),
+            "scaled": json_values(result["scaled"]),
+            "ranking": [result["names"][k] for k in result["ranking"]],
+            "image": image_cache.url(digest)
+        })
+    except Exception as e:
+        logging.error(f"Error in sensitivity: {e}")
+        return jsonify({"status": "Ошибка"})
+
+@app.route('/calibrate', methods=['POST'])
+def calibrate_parameters():
+    """
+    Подбор параметров (parameters - список имен, по умолчанию все) по наблюдаемым
+    кривым observed = {"C": [...], "Cf": [[Cf1..Cf5], ...]}; bounds - {имя: [low, high]}.
+    Начальное приближение - faks и equations запроса
+    """
+    try:
+        data = request.get_json()
+        initial_equations, faks, equations, _, time_value = parse_scenario(data)
+        result = calibrate(initial_equations, faks, equations, time_value, data["observed"],
+                           names=data.get("parameters"), bounds=data.get("bounds"),
+                           weights=data.get("weights"), max_nfev=int(data.get("max_nfev", 50)))
+        return jsonify({
+            "status": "Выполнено",
+            "parameters": result["names"],
+            "initial": result["initial"].tolist(),
+            "values": result["values"].tolist(),
+            "std_errors": json_values(result["std_errors"]),
+            "faks": result["faks"],
+            "equations": result["equations"],
+            "fit": {
+                "success": result["success"],
+                "message": result["message"],
+                "cost": result["cost"],
+                "rmse": result["rmse"],
+                "rmse_by_output": json_values(result["rmse_by_output"]),
+                "residuals": json_values(result["residuals"]),
+                "nfev": result["nfev"],
+                "njev": result["njev"],
+            },
+            "timing": {
+                "seconds": result["seconds"],
+                "solve_seconds": result["solve_seconds"],
+                "solves": result["solves"],
+                "members": result["members"],
+            }
+        })
+    except Exception as e:
+        logging.error(f"Error in calibrate: {e}")
+        return jsonify({"status": "Ошибка"})
+
+@app.route('/optimize', methods=['POST'])
+def optimize_losses():
+    """
+    Минимизация суммарных потерь при target_c (по умолчанию 1) по коэффициентам
+    parameters (по умолчанию χ1-χ6) при Cf_i <= restrictions[i];
+    bounds - {имя: [low, high]}, weights - весовые коэффициенты μ1-μ5
+    """
+    try:
+        data = request.get_json()
+        initial_equations, faks, equations, restrictions, time_value = parse_scenario(data)
+        result = optimize(initial_equations, faks, equations, restrictions, time_value,
+                          target_c=float(data.get("target_c", 1.0)),
+                          names=data.get("parameters"), bounds=data.get("bounds"),
+                          weights=data.get("weights"),
+                          population=min(int(data.get("population", 30)), 200),
+                          generations=min(int(data.get("generations", 40)), 500),
+                          seed=int(data.get("seed", 0)))
+        return jsonify({
+            "status": "Выполнено",
+            "parameters": result["names"],
+            "values": result["values"].tolist(),
+            "faks": result["faks"],
+            "equations": result["equations"],
+            "loss": result["loss"],
+            "Cf": result["Cf"].tolist(),
+            "feasible": result["feasible"],
+            "initial": {**result["initial"], "values": result["initial"]["values"].tolist(),
+                        "Cf": result["initial"]["Cf"].tolist()},
+            "trace": result["trace"],
+            "evaluations": result["evaluations"],
+            "seconds": result["seconds"]
+        })
+    except Exception as e:
+        logging.error(f"Error in optimize: {e}")
+        return jsonify({"status": "Ошибка"})
+
+def parse_batch(req):
+    """Сценарии /batch: JSON-список, {"scenarios": [...]} или NDJSON (по сценарию в строке)"""
+    if req.mimetype == 'application/x-ndjson':
+        scenarios = [json.loads(line) for line in req.get_data(as_text=True).splitlines() if line.strip()]
+    else:
+        data = req.get_json()
+        scenarios = data if isinstance(data, list) else data["scenarios"]
+    if not scenarios or len(scenarios) > MAX_BATCH:
+        raise ValueError(f"В пакете должно быть от 1 до {MAX_BATCH} сценариев")
+    if not all(isinstance(scenario, dict) for scenario in scenarios):
+        raise ValueError("Каждый сценарий - объект с параметрами как у /draw_graphics")
+    return scenarios
+
+def batch_line(index, scenario, summary):
+    """Строка NDJSON с итогами сценария; картинки - только при "render": true"""
+    line = {
+        "index": index,
+        "id": scenario.get("id"),
+        "status": "Выполнено",
+        "final": summary["final"].tolist(),
+        "crossings": json_values(summary["crossings"]),
+        "total_loss": summary["total_loss"],
+        "max_total_loss": summary["max_total_loss"],
+        "solver_stats": summary["solver_stats"],
+    }
+    if scenario.get("render"):
+        initial, faks, _, restrictions, time_value = parse_scenario(scenario)
+        artifacts = build_artifacts(summary["C"], summary["trajectory"], faks, time_value,
+                                    DisturbanceTable(faks, time_value), initial, restrictions, "",
+                                    summary["crossings"])
+        line["artifacts"] = {name: image_cache.url(digest)
+                             for name, (digest, _) in render_images(artifacts, image_cache).items()}
+    return line
+
+@app.route('/batch', methods=['POST'])
+def batch():
+    """
+    Пакет сценариев без картинок: расчеты идут в пуле из BATCH_WORKERS процессов,
+    ответ - NDJSON, строка на сценарий по мере готовности (index - номер в пакете),
+    последняя строка - итог пакета. Картинки строятся для сценариев с "render": true
+    """
+    try:
+        scenarios = parse_batch(request)
+    except Exception as e:
+        logging.error(f"Error in batch: {e}")
         return jsonify({"status": "Ошибка"})
 
+    def generate():
+        start = time.perf_counter()
+        pool = batch_pool()
+        queue = iter(enumerate(scenarios))
+        running = {}
+        errors = 0
+        while True:
+            # В работе не больше двух сценариев на процесс: остальные ждут своей очереди
+            for index, scenario in queue:
+                future = pool.submit(scenario_summary, scenario, bool(scenario.get("render")))
+                running[future] = (index, scenario)
+                if len(running) >= 2 * BATCH_WORKERS:
+                    break
+            if not running:
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, scenario = running.pop(future)
+                try:
+                    summary = future.result()
+                    # Расчет шел в процессе пула: его этапы и вычисления правой части учитываются здесь
+                    observe_stages(summary["timings"])
+                    count_solve(summary["solver_stats"])
+                    line = batch_line(index, scenario, summary)
+                except Exception as e:
+                    logging.error(f"Error in batch scenario {index}: {e}")
+                    errors += 1
+                    line = {"index": index, "id": scenario.get("id"), "status": "Ошибка", "error": str(e)}
+                yield json.dumps(line) + "\n"
+        yield json.dumps({"status": "Завершено", "scenarios": len(scenarios), "errors": errors,
+                          "seconds": time.perf_counter() - start}) + "\n"
+
+    return timed_stream(generate())
+
+@app.route('/monte_carlo', methods=['POST'])
+def monte_carlo_bands():
+    """
+    Монте-Карло по распределениям параметров (distributions: {имя: распределение}).
+    Ответ - NDJSON: строка с перцентилями 5/50/95 после каждого пакета,
+    в последней строке - адрес картинки с полосами
+    """
+    try:
+        data = request.get_json()
+        initial_equations, faks, equations, _, time_value = parse_scenario(data)
+        runs = monte_carlo(initial_equations, faks, equations, time_value, data.get("distributions", {}),
+                           samples=min(int(data.get("samples", 2000)), 20000),
+                           batch_size=int(data.get("batch_size", 250)),
+                           seed=int(data.get("seed", 0)))
+    except Exception as e:
+        logging.error(f"Error in monte_carlo: {e}")
+        return jsonify({"status": "Ошибка"})
+
+    def generate():
+        try:
+            for partial in runs:
+                line = {
+                    "status": "Выполнено" if partial["done"] else "Выполняется",
+                    "samples": partial["samples"],
+                    "C": partial["C"].tolist(),
+                    "percentiles": partial["percentiles"],
+                    "bands": partial["bands"].tolist(),
+                }
+                if partial["done"]:
+                    args = (partial["C"], partial["bands"], partial["samples"])
+                    digest = artifact_hash(create_band_graphic, args)
+                    if digest not in image_cache:
+                        image_cache.put(digest, render_png(create_band_graphic, args))
+                    line["image"] = image_cache.url(digest)
+                yield json.dumps(line) + "\n"
+        except Exception as e:
+            logging.error(f"Error in monte_carlo: {e}")
+            yield json.dumps({"status": "Ошибка"}) + "\n"
+
+    return timed_stream(generate())
+
+@app.route('/cache_stats')
+def cache_stats():
+    return jsonify({**result_cache.stats(), "images": image_cache.stats()})
+
+@app.route('/healthz')
+def healthz():
+    """Проверка живости: отвечает сразу, warm - прогрев завершен, imports - время импорта модулей"""
+    return jsonify({"status": "ok", "warm": warm.is_set(), "imports": IMPORT_SECONDS})
+
+@app.route('/metrics')
+def metrics():
+    """Счетчики и гистограммы в текстовом формате Prometheus"""
+    results, images = result_cache.stats(), image_cache.stats()
+    extra = []
+    for name in ("hits", "misses", "evictions"):
+        extra.append((f"ecology_cache_{name}", {"cache": "results"}, results[name]))
+        extra.append((f"ecology_cache_{name}", {"cache": "images"}, images[name]))
+    extra.append(("ecology_cache_bytes", {"cache": "results"}, results["memory_bytes"]))
+    extra.append(("ecology_cache_bytes", {"cache": "images"}, images["bytes"]))
+    for module, seconds in list(IMPORT_SECONDS.items()):
+        extra.append(("ecology_import_seconds", {"module": module}, seconds))
+    return Response(REGISTRY.render(extra), mimetype='text/plain; version=0.0.4')
+
 @app.route('/graphic')
 def get_graphic():
     return render_template('graphic.html')
@@ -80,10 +582,34 @@ def get_diagrams():
 def get_disturbances():
     return render_template('facks.html')
 
+@app.route('/images/<digest>.png')
+def get_image(digest):
+    """Картинка из памяти; ETag - хэш входных данных, повторный запрос с If-None-Match дает 304"""
+    image = image_cache.get(digest)
+    if image is None:
+        abort(404)
+    response = Response(image, mimetype='image/png')
+    response.set_etag(digest)
+    # Адрес картинки меняется вместе с данными, но браузер все равно сверяет ETag
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+@app.route('/artifacts/<run_id>/<name>')
+def get_artifact(run_id, name):
+    path = artifact_store.file_path(run_id, name)
+    if path is None:
+        abort(404)
+    return send_file(path, max_age=3600)
+
 @app.route('/clear_images', methods=['POST'])
 def clear_images():
-    """Очистка старых изображений"""
+    """Очистка старых изображений (с run_id в запросе - только картинок этого расчета)"""
     try:
+        data = request.get_json(silent=True) or {}
+        if data.get("run_id"):
+            artifact_store.remove(data["run_id"])
+            return jsonify({"status": "Images cleared"})
+
         images_to_clear = [
             'static/images/figure_eco.png',
             'static/images/disturbances_eco.png',
@@ -104,6 +630,10 @@ def clear_images():
         logging.error(f"Error clearing images: {e}")
         return jsonify({"status": "Error clearing images"})
 
+start_warmup()
+
 if __name__ == '__main__':
     logging.basicConfig(level=logging.INFO)
+    if RENDER_WORKERS:
+        start_render_pool(RENDER_WORKERS)
     app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
@@ -0,0 +1,108 @@
+# artifact_store.py
+# Хранилище картинок расчетов: отдельный каталог на каждый расчет, квота и TTL
+import logging
+import os
+import re
+import shutil
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+_RUN_ID = re.compile(r"^[0-9a-f]{8,64}$")
+_NAME = re.compile(r"^[\w.-]+\.(png|npy|json)$")
+
+
+class ArtifactStore:
+    """
+    Каталог root/<run_id>/<имя файла> на каждый расчет.
+    run_id - хэш параметров расчета, поэтому одинаковые расчеты делят каталог,
+    а разные не перезаписывают файлы друг друга.
+    Каталоги старше ttl_seconds с последнего обращения удаляются; если общий
+    объем больше quota_bytes, удаляются давно не использованные (LRU).
+    """
+
+    def __init__(self, root="./artifacts", quota_bytes=256 * 2**20, ttl_seconds=24 * 3600):
+        self.root = root
+        self.quota_bytes = quota_bytes
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    @staticmethod
+    def valid_run_id(run_id):
+        return bool(_RUN_ID.match(run_id or ""))
+
+    @staticmethod
+    def valid_name(name):
+        return bool(_NAME.match(name or ""))
+
+    def run_dir(self, run_id):
+        """Каталог расчета (создается при необходимости); отмечает обращение"""
+        if not self.valid_run_id(run_id):
+            raise ValueError(f"Некорректный идентификатор расчета: {run_id}")
+        path = os.path.join(self.root, run_id)
+        os.makedirs(path, exist_ok=True)
+        os.utime(path)
+        return path
+
+    def url(self, run_id, name):
+        return f"/artifacts/{run_id}/{name}"
+
+    def file_path(self, run_id, name):
+        """Путь к файлу для отдачи или None, если его нет"""
+        if not (self.valid_run_id(run_id) and self.valid_name(name)):
+            return None
+        path = os.path.join(self.root, run_id, name)
+        if not os.path.isfile(path):
+            return None
+        os.utime(os.path.join(self.root, run_id))
+        return path
+
+    def remove(self, run_id):
+        if self.valid_run_id(run_id):
+            shutil.rmtree(os.path.join(self.root, run_id), ignore_errors=True)
+
+    def evict(self, keep=()):
+        """Удаление устаревших каталогов и лишних по квоте; keep - не трогать эти расчеты"""
+        with self._lock:
+            now = time.time()
+            runs = []
+            for run_id in os.listdir(self.root):
+                path = os.path.join(self.root, run_id)
+                if not os.path.isdir(path) or run_id in keep:
+                    continue
+                last_access = os.path.getmtime(path)
+                if now - last_access > self.ttl_seconds:
+                    shutil.rmtree(path, ignore_errors=True)
+                    logger.info(f"Удален устаревший расчет {run_id}")
+                    continue
+                runs.append((last_access, _dir_size(path), path))
+
+            used = sum(size for _, size, _ in runs)
+            used += sum(_dir_size(os.path.join(self.root, run_id)) for run_id in keep
+                        if os.path.isdir(os.path.join(self.root, run_id)))
+            for _, size, path in sorted(runs):
+                if used <= self.quota_bytes:
+                    break
+                shutil.rmtree(path, ignore_errors=True)
+                used -= size
+
+    def stats(self):
+        runs = [d for d in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, d))]
+        return {
+            "runs": len(runs),
+            "bytes": sum(_dir_size(os.path.join(self.root, d)) for d in runs),
+            "quota_bytes": self.quota_bytes,
+            "ttl_seconds": self.ttl_seconds,
+        }
+
+
+def _dir_size(path):
+    total = 0
+    for name in os.listdir(path):
+        try:
+            total += os.path.getsize(os.path.join(path, name))
+        except OSError:
+            pass
+    return total
@@ -0,0 +1,60 @@
+# benchmarks/bench_ensemble.py
+# Пакетный расчет N сценариев (solve_ensemble) против N отдельных вызовов odeint
+# Запуск из корня проекта: python -m benchmarks.bench_ensemble --size 10000
+import argparse
+import time
+
+import numpy as np
+from scipy.integrate import odeint
+
+from functions import PendRHS
+from process_ecology import solve_ensemble, parse_scenario
+from benchmarks.payloads import random_payload
+
+XM = [1.0, 1.0, 1.0, 1.0, 1.0]
+
+
+def run(size=1000, sample=50, seed=0):
+    rng = np.random.default_rng(seed)
+    scenarios = [random_payload(rng) for _ in range(size)]
+    C = np.linspace(0, 1, 100)
+
+    start = time.perf_counter()
+    ensemble = solve_ensemble(scenarios, C)
+    ensemble_time = time.perf_counter() - start
+
+    # Отдельные расчеты - на выборке, время пересчитывается на весь пакет
+    sample = min(sample, size)
+    start = time.perf_counter()
+    single = []
+    for scenario in scenarios[:sample]:
+        initial_equations, faks, equations, _, time_value = parse_scenario(scenario)
+        single.append(odeint(PendRHS(faks, equations, XM, time_value), initial_equations, C))
+    single_time = (time.perf_counter() - start) / sample * size
+
+    return {
+        "scenarios": size,
+        "ensemble_seconds": ensemble_time,
+        "single_seconds_estimate": single_time,
+        "speedup": single_time / ensemble_time,
+        "max_abs_difference": float(np.abs(ensemble[:sample] - np.array(single)).max()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=1000)
+    parser.add_argument("--sample", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    result = run(args.size, args.sample, args.seed)
+    print(f"Сценариев: {result['scenarios']}")
+    print(f"solve_ensemble:      {result['ensemble_seconds']:.2f} с")
+    print(f"odeint по одному:    {result['single_seconds_estimate']:.2f} с (оценка)")
+    print(f"Ускорение: {result['speedup']:.1f}x")
+    print(f"Макс. расхождение с odeint: {result['max_abs_difference']:.3e}")
+
+
+if __name__ == "__main__":
+    main()
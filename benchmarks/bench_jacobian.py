@@ -0,0 +1,118 @@
+# benchmarks/bench_jacobian.py
+# Проверка аналитической матрицы Якоби (PendRHS.jacobian) по центральным разностям
+# и сравнение числа вычислений правой части с ней и без нее
+# Запуск из корня проекта: python -m benchmarks.bench_jacobian --size 20
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from functions import PendRHS
+from solvers import integrate, dopri_ensemble
+from benchmarks.payloads import default_payload, random_payload, as_floats, random_states
+
+XM = [1.0, 1.0, 1.0, 1.0, 1.0]
+# Допустимое расхождение с центральными разностями
+TOLERANCE = 1e-5
+
+
+class CountingRHS:
+    """
+    Правая часть со счетчиком вызовов. nfev решателей не включает вычисления
+    для матрицы Якоби по разностям (solve_ivp) - здесь считается каждый вызов
+    """
+
+    def __init__(self, rhs):
+        self.rhs = rhs
+        self.calls = 0
+
+    def __getattr__(self, name):
+        return getattr(self.rhs, name)
+
+    def __call__(self, x, C):
+        self.calls += 1
+        return self.rhs(x, C)
+
+    def derivatives(self, x, C):
+        self.calls += 1
+        return self.rhs.derivatives(x, C)
+
+
+def numeric_jacobian(func, x, C, h=1e-7):
+    """Центральные разности по каждой переменной: [5 x 5]"""
+    jac = np.empty((len(x), len(x)))
+    for j in range(len(x)):
+        step = np.zeros(len(x))
+        step[j] = h
+        jac[:, j] = (func(x + step, C) - func(x - step, C)) / (2.0 * h)
+    return jac
+
+
+def check(rhs_list, rng, states=200):
+    """Наибольшее расхождение derivatives_jacobian с разностями в случайных точках"""
+    worst = 0.0
+    for rhs in rhs_list:
+        for x, c in zip(*random_states(rng, states)):
+            difference = np.abs(rhs.derivatives_jacobian(x, c) - numeric_jacobian(rhs.derivatives, x, c)).max()
+            worst = max(worst, float(difference))
+    return worst
+
+
+def run(size=20, seed=0, rtol=None, atol=None):
+    rng = np.random.default_rng(seed)
+    C = np.linspace(0, 1, 100)
+    payloads = [default_payload()] + [random_payload(rng) for _ in range(size - 1)]
+    cases = []
+    for payload in payloads:
+        initial_equations, faks, equations, _, t = as_floats(payload)
+        rhs = PendRHS(faks, equations, XM, t)
+        reference = dopri_ensemble(PendRHS(faks, equations, XM, [t]), [initial_equations], C,
+                                   rtol=1e-12, atol=1e-12)[0]
+        cases.append((rhs, initial_equations, reference))
+
+    results = {}
+    for solver in ("odeint", "LSODA", "Radau", "BDF"):
+        for analytic in (False, True):
+            totals = {"seconds": 0.0, "calls": 0, "nfev": 0, "njev": 0, "max_abs_difference": 0.0}
+            for rhs, initial_equations, reference in cases:
+                counting = CountingRHS(rhs)
+                start = time.perf_counter()
+                sol, stats = integrate(counting, initial_equations, C, solver, rtol, atol,
+                                       analytic_jacobian=analytic)
+                totals["seconds"] += time.perf_counter() - start
+                totals["calls"] += counting.calls
+                totals["nfev"] += stats["nfev"]
+                totals["njev"] += stats["njev"]
+                totals["max_abs_difference"] = max(totals["max_abs_difference"],
+                                                   float(np.abs(sol - reference).max()))
+            results[solver, analytic] = totals
+    return check([rhs for rhs, _, _ in cases], rng), results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rtol", type=float, default=None)
+    parser.add_argument("--atol", type=float, default=None)
+    args = parser.parse_args()
+
+    worst, results = run(args.size, args.seed, args.rtol, args.atol)
+    print(f"Расхождение с центральными разностями: {worst:.3e} (допуск {TOLERANCE:.0e})")
+    print(f"{'решатель':8} {'якобиан':>9} {'время, с':>9} {'вызовов':>8} {'nfev':>8} {'njev':>6} "
+          f"{'расхождение':>12}")
+    for solver in dict.fromkeys(solver for solver, _ in results):
+        numeric, analytic = results[solver, False], results[solver, True]
+        for name, r in (("разности", numeric), ("аналит.", analytic)):
+            print(f"{solver:8} {name:>9} {r['seconds']:9.3f} {r['calls']:8d} {r['nfev']:8d} {r['njev']:6d} "
+                  f"{r['max_abs_difference']:12.3e}")
+        if numeric["calls"]:
+            print(f"{'':8} {'':>9} вычислений правой части меньше на "
+                  f"{100 * (1 - analytic['calls'] / numeric['calls']):.0f}%")
+    if worst > TOLERANCE:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
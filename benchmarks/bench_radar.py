@@ -0,0 +1,60 @@
+# benchmarks/bench_radar.py
+# Время на одну лепестковую диаграмму: новая фигура на вызов и постоянный шаблон
+# Запуск из корня проекта: python -m benchmarks.bench_radar --runs 3
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from radar_diagram import RadarDiagram
+
+
+def seconds_per_diagram(radar, slices, initial, restrictions, runs, directory):
+    start = time.perf_counter()
+    for _ in range(runs):
+        for i, current in enumerate(slices):
+            radar.draw(os.path.join(directory, f"diagram{i}.png"), initial, current, "",
+                       f"C = {i}", restrictions, show_both_lines=i != 0)
+    return (time.perf_counter() - start) / (runs * len(slices))
+
+
+def run(runs=3, seed=0):
+    rng = np.random.default_rng(seed)
+    initial = rng.uniform(0, 1, 5)
+    restrictions = rng.uniform(0.3, 1.0, 5)
+    # Шесть срезов C, как в fill_diagrams
+    slices = [initial] + [rng.uniform(0, 1, 5) for _ in range(5)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        legacy = seconds_per_diagram(RadarDiagram(reuse_figure=False), slices, initial,
+                                     restrictions, runs, directory)
+        reused = RadarDiagram()
+        # Первый прогон строит шаблоны - его считаем отдельно
+        first = seconds_per_diagram(reused, slices, initial, restrictions, 1, directory)
+        steady = seconds_per_diagram(reused, slices, initial, restrictions, runs, directory)
+
+    return {
+        "legacy_seconds": legacy,
+        "template_first_run_seconds": first,
+        "template_seconds": steady,
+        "speedup": legacy / steady,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    result = run(args.runs, args.seed)
+    print(f"Новая фигура на вызов:       {result['legacy_seconds'] * 1000:.0f} мс/диаграмма")
+    print(f"Шаблон, первый расчет:       {result['template_first_run_seconds'] * 1000:.0f} мс/диаграмма")
+    print(f"Шаблон, повторные расчеты:   {result['template_seconds'] * 1000:.0f} мс/диаграмма")
+    print(f"Ускорение: {result['speedup']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
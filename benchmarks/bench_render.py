@@ -0,0 +1,91 @@
+# benchmarks/bench_render.py
+# Рендер восьми картинок расчета: последовательно, в пуле процессов и в память
+# Запуск из корня проекта: python -m benchmarks.bench_render --workers 4
+import argparse
+import os
+import time
+
+import numpy as np
+
+import process_ecology
+from cache import ImageCache
+from functions import PendRHS, DisturbanceTable
+from solvers import integrate
+from benchmarks.payloads import default_payload, as_floats
+
+XM = [1.0, 1.0, 1.0, 1.0, 1.0]
+
+
+def default_artifacts():
+    """Артефакты process() для сценария по умолчанию"""
+    initial_equations, faks, equations, restrictions, t = as_floats(default_payload())
+    C = np.linspace(0, 1, 100)
+    table = DisturbanceTable(faks, t, C)
+    data, _ = integrate(PendRHS(faks, equations, XM, t), initial_equations, C)
+    return process_ecology.build_artifacts(C, data, faks, t, table, initial_equations, restrictions)
+
+
+def timed_render(artifacts, executor=None, repeat=3):
+    best = float("inf")
+    for _ in range(repeat):
+        # Сбрасываем память о прошлом рендере, чтобы рисовалось все
+        process_ecology._rendered.clear()
+        start = time.perf_counter()
+        process_ecology.render_artifacts(artifacts, executor)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(workers=None, repeat=3):
+    os.makedirs('./static/images', exist_ok=True)
+    artifacts = default_artifacts()
+    serial = timed_render(artifacts, None, repeat)
+
+    # Самая долгая отдельная картинка - нижняя граница для параллельного рендера
+    slowest = 0.0
+    for fname, func, args in artifacts:
+        start = time.perf_counter()
+        func(*args, filename=fname)
+        slowest = max(slowest, time.perf_counter() - start)
+
+    # Рендер в память (ImageCache) вместо файлов
+    memory = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        process_ecology.render_images(artifacts, ImageCache())
+        memory = min(memory, time.perf_counter() - start)
+
+    pool = process_ecology.start_render_pool(workers)
+    try:
+        parallel = timed_render(artifacts, pool, repeat)
+    finally:
+        process_ecology.stop_render_pool()
+
+    return {
+        "artifacts": len(artifacts),
+        "workers": workers or os.cpu_count(),
+        "serial_seconds": serial,
+        "pool_seconds": parallel,
+        "memory_seconds": memory,
+        "slowest_single_seconds": slowest,
+        "speedup": serial / parallel,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    result = run(args.workers, args.repeat)
+    print(f"Картинок: {result['artifacts']}, процессов: {result['workers']}")
+    print(f"Последовательно:       {result['serial_seconds']:.2f} с")
+    print(f"Пул процессов:         {result['pool_seconds']:.2f} с")
+    print(f"В память:              {result['memory_seconds']:.2f} с")
+    print(f"Самая долгая картинка: {result['slowest_single_seconds']:.2f} с")
+    print(f"Ускорение: {result['speedup']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# benchmarks/bench_rhs.py
+# Сравнение скорости pend и PendRHS (вычислений правой части в секунду)
+# Запуск из корня проекта: python -m benchmarks.bench_rhs
+import argparse
+import time
+
+import numpy as np
+
+from functions import pend, PendRHS
+from benchmarks.payloads import default_payload, random_payload, as_floats, random_states
+
+XM = [1.0, 1.0, 1.0, 1.0, 1.0]
+
+
+def evals_per_second(func, states, concentrations, min_time=0.5):
+    """Сколько раз в секунду func(x, C) успевает вычислиться на наборе состояний"""
+    calls = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while elapsed < min_time:
+        for x, c in zip(states, concentrations):
+            func(x, c)
+        calls += len(states)
+        elapsed = time.perf_counter() - start
+    return calls / elapsed
+
+
+def max_difference(payloads, rng, points=200):
+    """Наибольшее расхождение PendRHS и pend на случайных состояниях"""
+    worst = 0.0
+    for payload in payloads:
+        _, faks, equations, _, t = as_floats(payload)
+        rhs = PendRHS(faks, equations, XM, t)
+        states, concentrations = random_states(rng, points)
+        for x, c in zip(states, concentrations):
+            diff = np.abs(np.asarray(pend(x, c, faks, equations, XM, t)) - rhs(x, c))
+            worst = max(worst, float(diff.max()))
+    return worst
+
+
+def run(min_time=0.1, seed=0, repeat=31):
+    """
+    Замеры pend и PendRHS по очереди repeat раз на одном наборе состояний
+    (сценарий по умолчанию, фиксированный seed). Медиана по повторам устойчива
+    к фоновой нагрузке; ускорение - медиана отношений в каждом повторе
+    """
+    rng = np.random.default_rng(seed)
+    _, faks, equations, _, t = as_floats(default_payload())
+    states, concentrations = random_states(rng, 1000)
+
+    rhs = PendRHS(faks, equations, XM, t)
+    legacy, compiled = [], []
+    for _ in range(repeat):
+        legacy.append(evals_per_second(lambda x, c: pend(x, c, faks, equations, XM, t), states, concentrations,
+                                       min_time))
+        compiled.append(evals_per_second(rhs, states, concentrations, min_time))
+    ratios = np.array(compiled) / np.array(legacy)
+
+    payloads = [default_payload()] + [random_payload(rng) for _ in range(20)]
+    return {
+        "pend_evals_per_second": float(np.median(legacy)),
+        "rhs_evals_per_second": float(np.median(compiled)),
+        "speedup": float(np.median(ratios)),
+        "speedup_quartiles": np.percentile(ratios, [25, 75]).tolist(),
+        "max_abs_difference": max_difference(payloads, rng),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--min-time", type=float, default=0.1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=31)
+    args = parser.parse_args()
+
+    result = run(args.min_time, args.seed, args.repeat)
+    print(f"pend:     {result['pend_evals_per_second']:12.0f} вычислений/с (медиана)")
+    print(f"PendRHS:  {result['rhs_evals_per_second']:12.0f} вычислений/с (медиана)")
+    low, high = result["speedup_quartiles"]
+    print(f"Ускорение: {result['speedup']:.2f}x (квартили {low:.2f}-{high:.2f}x)")
+    print(f"Макс. расхождение с pend: {result['max_abs_difference']:.3e}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+# benchmarks/bench_solvers.py
+# Сравнение решателей (время, nfev/njev/шаги, точность относительно эталона)
+# Запуск из корня проекта: python -m benchmarks.bench_solvers --size 20
+import argparse
+import time
+
+import numpy as np
+
+from functions import PendRHS
+from solvers import SOLVERS, integrate, dopri_ensemble
+from benchmarks.payloads import default_payload, random_payload, as_floats
+
+XM = [1.0, 1.0, 1.0, 1.0, 1.0]
+
+
+def run(size=20, seed=0, rtol=None, atol=None):
+    rng = np.random.default_rng(seed)
+    C = np.linspace(0, 1, 100)
+    payloads = [default_payload()] + [random_payload(rng) for _ in range(size - 1)]
+    cases = []
+    for payload in payloads:
+        initial_equations, faks, equations, _, t = as_floats(payload)
+        rhs = PendRHS(faks, equations, XM, t)
+        # Эталон - пакетный Дорман-Принс с жесткими допусками
+        reference = dopri_ensemble(PendRHS(faks, equations, XM, [t]), [initial_equations], C,
+                                   rtol=1e-12, atol=1e-12)[0]
+        cases.append((rhs, initial_equations, reference))
+
+    results = {}
+    for solver in SOLVERS:
+        totals = {"seconds": 0.0, "nfev": 0, "njev": 0, "nsteps": 0, "max_abs_difference": 0.0}
+        for rhs, initial_equations, reference in cases:
+            start = time.perf_counter()
+            sol, stats = integrate(rhs, initial_equations, C, solver, rtol, atol)
+            totals["seconds"] += time.perf_counter() - start
+            for key in ("nfev", "njev", "nsteps"):
+                totals[key] += stats[key]
+            totals["max_abs_difference"] = max(totals["max_abs_difference"],
+                                               float(np.abs(sol - reference).max()))
+        results[solver] = totals
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rtol", type=float, default=None)
+    parser.add_argument("--atol", type=float, default=None)
+    args = parser.parse_args()
+
+    results = run(args.size, args.seed, args.rtol, args.atol)
+    print(f"{'решатель':8} {'время, с':>9} {'nfev':>8} {'njev':>6} {'шагов':>7} {'расхождение':>12}")
+    for solver, r in results.items():
+        print(f"{solver:8} {r['seconds']:9.3f} {r['nfev']:8d} {r['njev']:6d} {r['nsteps']:7d} "
+              f"{r['max_abs_difference']:12.3e}")
+
+
+if __name__ == "__main__":
+    main()
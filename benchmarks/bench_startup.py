@@ -0,0 +1,70 @@
+# benchmarks/bench_startup.py
+# Холодный старт: импорт app, первый /healthz, первый и второй /draw_graphics в новом процессе,
+# без прогрева и с прогревом WARMUP=sync; время импорта тяжелых модулей
+# Запуск из корня проекта: python -m benchmarks.bench_startup
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Выполняется в отдельном процессе: печатает JSON с замерами
+_PROBE = """
+import json, time
+start = time.perf_counter()
+import app as application
+imported = time.perf_counter() - start
+from benchmarks.payloads import default_payload
+from benchmarks.isolated import isolated_caches
+
+client = application.app.test_client()
+start = time.perf_counter()
+warm = client.get("/healthz").get_json()["warm"]
+health = time.perf_counter() - start
+
+def draw():
+    application.result_cache.clear()
+    application.image_cache.clear()
+    start = time.perf_counter()
+    job_url = client.post("/draw_graphics", json=default_payload()).get_json()["job_url"]
+    while client.get(job_url).get_json()["state"] not in ("done", "error"):
+        time.sleep(0.005)
+    return time.perf_counter() - start
+
+# Оба запроса считаются заново; второй - установившееся время без затрат на старт.
+# Кэши во временном каталоге: очистка не трогает ./cache
+with isolated_caches(application):
+    first, second = draw(), draw()
+print(json.dumps({"warm": warm, "import_ms": 1000 * imported, "healthz_ms": 1000 * health,
+                  "first_draw_graphics_ms": 1000 * first, "second_draw_graphics_ms": 1000 * second,
+                  "imports_ms": {k: 1000 * v for k, v in application.IMPORT_SECONDS.items()}}))
+"""
+
+
+def probe(warmup=""):
+    env = dict(os.environ, WARMUP=warmup)
+    output = subprocess.run([sys.executable, "-c", _PROBE], env=env, capture_output=True, text=True,
+                            check=True).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    for mode, title in (("", "без прогрева"), ("sync", "WARMUP=sync")):
+        runs = [probe(mode) for _ in range(args.repeat)]
+        print(title)
+        # С WARMUP=sync прогрев должен завершиться до первого запроса
+        if mode == "sync" and not all(run["warm"] for run in runs):
+            sys.exit("Прогрев не выполнен: /healthz отвечает warm=false (см. Error in warmup в логе)")
+        for key in ("import_ms", "healthz_ms", "first_draw_graphics_ms", "second_draw_graphics_ms"):
+            values = sorted(run[key] for run in runs)
+            print(f"  {key:24} {values[len(values) // 2]:10.1f} мс")
+        for module, ms in runs[-1]["imports_ms"].items():
+            print(f"  импорт {module:17} {ms:10.1f} мс")
+
+
+if __name__ == "__main__":
+    main()
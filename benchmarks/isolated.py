@@ -0,0 +1,26 @@
+# benchmarks/isolated.py
+# Кэши и очередь заданий app во временном каталоге: замеры очищают кэши,
+# не трогая ./cache разработчика
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+from cache import ImageCache, ResultCache
+from jobs import JobQueue
+
+
+@contextmanager
+def isolated_caches(application):
+    """Подмена result_cache, image_cache и job_queue модуля app на время замера"""
+    saved = application.result_cache, application.image_cache, application.job_queue
+    directory = tempfile.mkdtemp(prefix="ecology-bench-")
+    application.result_cache = ResultCache(os.path.join(directory, "results"))
+    application.image_cache = ImageCache(directory=os.path.join(directory, "images"))
+    application.job_queue = JobQueue(directory=os.path.join(directory, "jobs"))
+    try:
+        yield directory
+    finally:
+        application.job_queue.shutdown()
+        application.result_cache, application.image_cache, application.job_queue = saved
+        shutil.rmtree(directory, ignore_errors=True)
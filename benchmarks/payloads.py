@@ -0,0 +1,54 @@
+# benchmarks/payloads.py
+# Типовые входные данные для замеров (те же значения, что подставляет интерфейс)
+import copy
+
+# Значения кнопки "Очистить" в script.js (значения из документа)
+DEFAULT_PAYLOAD = {
+    "initial_equations": ["0.5", "0.7", "0.9", "0.4", "0.5"],
+    "faks": [["0.1", "2.0"] for _ in range(14)],
+    "equations": [
+        ["0.5", "0.5"], ["0.3", "15"], ["0.3", "0.4", "0.5"],
+        ["0.7", "11"], ["0.8", "9"], ["0.8", "12"],
+        ["0.8", "11"], ["0.7", "13"], [],
+        ["0.55", "13"], ["0.55", "12", "2"], ["0.5", "3"],
+    ],
+    "restrictions": ["1.0", "1.0", "1.0", "1.0", "1.0"],
+    "time_value": "0.5",
+}
+
+
+def default_payload():
+    return copy.deepcopy(DEFAULT_PAYLOAD)
+
+
+def random_payload(rng):
+    """Случайный набор параметров по правилам refill() из script.js"""
+    def in_range():
+        return round(float(rng.uniform(0.01, 0.99)), 2)
+
+    payload = default_payload()
+    payload["time_value"] = str(rng.choice([0, 0.25, 0.5, 0.75, 1]))
+    payload["faks"] = [[str(in_range()), str(in_range())] for _ in range(14)]
+    limits = [round(float(rng.uniform(0.3, 0.9)), 2) for _ in range(5)]
+    payload["restrictions"] = [str(v) for v in limits]
+    payload["initial_equations"] = [str(round(float(rng.uniform(0.2, v)), 2)) for v in limits]
+    payload["equations"] = [
+        [str(in_range()) for _ in eq] if eq else [] for eq in DEFAULT_PAYLOAD["equations"]
+    ]
+    payload["equations"][2] = sorted(payload["equations"][2], key=float)
+    return payload
+
+
+def as_floats(payload):
+    """Числовые параметры расчета: initial_equations, faks, equations, restrictions, t"""
+    initial = [float(v) for v in payload["initial_equations"]]
+    faks = [[float(v) for v in row] for row in payload["faks"]]
+    equations = [[float(v) for v in row] for row in payload["equations"]]
+    restrictions = [float(v) for v in payload["restrictions"]]
+    return initial, faks, equations, restrictions, float(payload.get("time_value", 0.0))
+
+
+def random_states(rng, count):
+    """Случайные состояния Cf и концентрации для вызова правой части"""
+    return rng.uniform(0.0, 1.0, (count, 5)), rng.uniform(0.0, 1.0, count)
+
@@ -0,0 +1,210 @@
+# benchmarks/run.py
+# Набор замеров: правая часть, решатель, каждая картинка и /draw_graphics целиком.
+# Результат - JSON; сравнение с сохраненной базой, код выхода 1 при замедлении.
+# Запуск из корня проекта:
+#   python -m benchmarks.run                          # замер и сравнение с benchmarks/baseline.json
+#   python -m benchmarks.run --save-baseline          # замер и запись новой базы
+#   python -m benchmarks.run --quick --output out.json
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import matplotlib
+import numpy as np
+import scipy
+
+import process_ecology
+from functions import pend, PendRHS, DisturbanceTable
+from solvers import integrate
+from benchmarks.bench_rhs import evals_per_second
+from benchmarks.payloads import default_payload, random_payload, as_floats, random_states
+
+XM = [1.0, 1.0, 1.0, 1.0, 1.0]
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+# Замедление больше чем на THRESHOLD считается регрессией
+THRESHOLD = 0.25
+
+
+def median_seconds(func, repeat):
+    """Медиана времени вызова func() по repeat повторам"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def metric(value, unit, better):
+    return {"value": value, "unit": unit, "better": better}
+
+
+def bench_rhs(min_time, rng):
+    _, faks, equations, _, t = as_floats(default_payload())
+    states, concentrations = random_states(rng, 1000)
+    rhs = PendRHS(faks, equations, XM, t)
+    return {
+        "pend_evals_per_second": metric(
+            evals_per_second(lambda x, c: pend(x, c, faks, equations, XM, t), states, concentrations, min_time),
+            "1/s", "higher"),
+        "rhs_evals_per_second": metric(evals_per_second(rhs, states, concentrations, min_time), "1/s", "higher"),
+    }
+
+
+def bench_solve(payloads, repeat):
+    """odeint на сетке по умолчанию: медиана по сценариям медиан по повторам"""
+    C = np.linspace(0, 1, 100)
+    times = []
+    for payload in payloads:
+        initial_equations, faks, equations, _, t = as_floats(payload)
+        rhs = PendRHS(faks, equations, XM, t)
+        times.append(median_seconds(lambda: integrate(rhs, initial_equations, C, "odeint"), repeat))
+    return {"odeint_solve_ms": metric(1000 * statistics.median(times), "ms", "lower")}
+
+
+def bench_render(repeat):
+    """Каждая картинка process() по отдельности, в файлы во временном каталоге"""
+    initial_equations, faks, equations, restrictions, t = as_floats(default_payload())
+    C = np.linspace(0, 1, 100)
+    table = DisturbanceTable(faks, t)
+    data, _ = integrate(PendRHS(faks, equations, XM, t), initial_equations, C)
+
+    with tempfile.TemporaryDirectory() as directory:
+        graphic = os.path.join(directory, "figure_eco.png")
+        disturbances = os.path.join(directory, "disturbances_eco.png")
+        cases = {
+            "create_graphic_ms": lambda: process_ecology.create_graphic(C, data, filename=graphic),
+            "create_disturbances_graphic_ms": lambda: process_ecology.create_disturbances_graphic(
+                C, faks, t, table, filename=disturbances),
+            "fill_diagrams_ms": lambda: [
+                func(*args, filename=fname) for fname, func, args in
+                process_ecology.diagram_artifacts(data, initial_equations, restrictions, directory, C)],
+        }
+        # Первый вызов (шрифты, шаблоны диаграмм) в замер не входит
+        for func in cases.values():
+            func()
+        return {name: metric(1000 * median_seconds(func, repeat), "ms", "lower") for name, func in cases.items()}
+
+
+def bench_endpoint(payloads, repeat):
+    """Задержка /draw_graphics через тестовый клиент Flask: от запроса до готового задания"""
+    import app as application
+    from benchmarks.isolated import isolated_caches
+
+    client = application.app.test_client()
+
+    def request(payload):
+        job_url = client.post("/draw_graphics", json=payload).get_json()["job_url"]
+        while True:
+            job = client.get(job_url).get_json()
+            if job["state"] in ("done", "error"):
+                if job["state"] == "error":
+                    raise RuntimeError(job.get("error"))
+                return
+            time.sleep(0.005)
+
+    def cold():
+        for payload in payloads:
+            application.result_cache.clear()
+            application.image_cache.clear()
+            request(payload)
+
+    with isolated_caches(application):
+        cold_seconds = median_seconds(cold, repeat) / len(payloads)
+        # Повтор тех же запросов: ответ из кэша результатов
+        for payload in payloads:
+            request(payload)
+        warm_seconds = median_seconds(lambda: [request(p) for p in payloads], repeat) / len(payloads)
+    return {
+        "draw_graphics_ms": metric(1000 * cold_seconds, "ms", "lower"),
+        "draw_graphics_cached_ms": metric(1000 * warm_seconds, "ms", "lower"),
+    }
+
+
+def run(quick=False, seed=0):
+    rng = np.random.default_rng(seed)
+    repeat = 2 if quick else 5
+    payloads = [default_payload()] + [random_payload(rng) for _ in range(2 if quick else 9)]
+
+    results = {}
+    results.update(bench_rhs(0.2 if quick else 1.0, rng))
+    results.update(bench_solve(payloads, repeat))
+    results.update(bench_render(repeat))
+    results.update(bench_endpoint(payloads[:2 if quick else 3], 1 if quick else 3))
+    return {"environment": environment(), "results": results}
+
+
+def environment():
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "matplotlib": matplotlib.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(report, baseline, threshold=THRESHOLD):
+    """
+    Сравнение с базой: отношение "во сколько раз хуже" (> 1 - медленнее)
+    и признак регрессии, если хуже больше чем на threshold
+    """
+    comparison = {}
+    for name, current in report["results"].items():
+        base = baseline["results"].get(name)
+        if base is None or not base["value"] or not current["value"]:
+            continue
+        if current["better"] == "higher":
+            ratio = base["value"] / current["value"]
+        else:
+            ratio = current["value"] / base["value"]
+        comparison[name] = {"baseline": base["value"], "ratio": ratio, "regression": ratio > 1 + threshold}
+    return comparison
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замеры производительности и сравнение с базой")
+    parser.add_argument("--quick", action="store_true", help="меньше повторов и сценариев")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="файл для JSON с результатами")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="записать результаты как новую базу")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = parser.parse_args()
+
+    report = run(args.quick, args.seed)
+
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            report["comparison"] = compare(report, json.load(f), args.threshold)
+
+    for name, result in report["results"].items():
+        line = f"{name:34} {result['value']:14.2f} {result['unit']}"
+        diff = report.get("comparison", {}).get(name)
+        if diff is not None:
+            line += f"   база {diff['baseline']:.2f}, x{diff['ratio']:.2f}"
+            if diff["regression"]:
+                line += "  РЕГРЕССИЯ"
+        print(line)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"База сохранена: {args.baseline}")
+
+    if any(diff["regression"] for diff in report.get("comparison", {}).values()):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,324 @@
+# cache.py
+# Кэш результатов расчета по хэшу параметров: траектория и готовые картинки
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(params):
+    """SHA-256 канонического JSON параметров (порядок ключей не важен)"""
+    text = json.dumps(params, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def entry_size(entry):
+    """Размер записи в байтах: траектория, сетка C и картинки"""
+    grid = entry.get("grid")
+    return (entry["trajectory"].nbytes + (grid.nbytes if grid is not None else 0)
+            + sum(len(data) for data in entry["images"].values()))
+
+
+class ResultCache:
+    """
+    Двухуровневый LRU-кэш: в памяти (OrderedDict) и на диске (файл .npz на запись).
+    memory_bytes, disk_bytes - бюджеты уровней; при превышении вытесняются
+    давно не использованные записи (на диске - по времени последнего доступа).
+    disk_bytes = 0 или directory = None отключают дисковый уровень.
+    """
+
+    def __init__(self, directory="./cache", memory_bytes=64 * 2**20, disk_bytes=512 * 2**20):
+        self.directory = directory if disk_bytes else None
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._memory = OrderedDict()
+        self._memory_used = 0
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def get(self, key):
+        """Запись {"trajectory", "grid", "stats", "images"} или None"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.counters["hits"] += 1
+                self.counters["memory_hits"] += 1
+                return entry
+
+            entry = self._load(key)
+            if entry is None:
+                self.counters["misses"] += 1
+                return None
+            self.counters["hits"] += 1
+            self.counters["disk_hits"] += 1
+            self._remember(key, entry)
+            return entry
+
+    def put(self, key, trajectory, stats, images, grid=None):
+        """Сохранение результата: images - {имя файла: байты PNG}, grid - сетка C траектории"""
+        entry = {"trajectory": np.asarray(trajectory, dtype=float),
+                 "grid": None if grid is None else np.asarray(grid, dtype=float),
+                 "stats": dict(stats), "images": dict(images)}
+        with self._lock:
+            self._remember(key, entry)
+            self._save(key, entry)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_used = 0
+            for name in self._disk_files():
+                os.remove(os.path.join(self.directory, name))
+
+    def stats(self):
+        with self._lock:
+            requests = self.counters["hits"] + self.counters["misses"]
+            disk_files = self._disk_files()
+            return {
+                **self.counters,
+                "hit_rate": self.counters["hits"] / requests if requests else 0.0,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_used,
+                "memory_budget": self.memory_bytes,
+                "disk_entries": len(disk_files),
+                "disk_bytes": sum(os.path.getsize(os.path.join(self.directory, n)) for n in disk_files),
+                "disk_budget": self.disk_bytes,
+            }
+
+    def _remember(self, key, entry):
+        size = entry_size(entry)
+        if size > self.memory_bytes:
+            return
+        if key in self._memory:
+            self._memory_used -= entry_size(self._memory.pop(key))
+        self._memory[key] = entry
+        self._memory_used += size
+        while self._memory_used > self.memory_bytes:
+            _, old = self._memory.popitem(last=False)
+            self._memory_used -= entry_size(old)
+            self.counters["evictions"] += 1
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+    def _disk_files(self):
+        if not self.directory or not os.path.isdir(self.directory):
+            return []
+        return [name for name in os.listdir(self.directory) if name.endswith(".npz")]
+
+    def _load(self, key):
+        if not self.directory or not os.path.exists(self._path(key)):
+            return None
+        try:
+            with np.load(self._path(key)) as data:
+                names = json.loads(str(data["names"]))
+                entry = {
+                    "trajectory": data["trajectory"],
+                    "grid": data["grid"] if "grid" in data.files else None,
+                    "stats": json.loads(str(data["stats"])),
+                    "images": {name: data[f"image{i}"].tobytes() for i, name in enumerate(names)},
+                }
+            # Время доступа для LRU на диске
+            os.utime(self._path(key))
+            return entry
+        except Exception as e:
+            logger.error(f"Ошибка чтения кэша {key}: {e}")
+            return None
+
+    def _save(self, key, entry):
+        if not self.directory:
+            return
+        names = list(entry["images"])
+        arrays = {f"image{i}": np.frombuffer(entry["images"][name], dtype=np.uint8) for i, name in enumerate(names)}
+        if entry["grid"] is not None:
+            arrays["grid"] = entry["grid"]
+        tmp = self._path(key) + ".tmp"
+        try:
+            with open(tmp, "wb") as f:
+                np.savez(f, trajectory=entry["trajectory"], stats=json.dumps(entry["stats"]),
+                         names=json.dumps(names), **arrays)
+            os.replace(tmp, self._path(key))
+        except Exception as e:
+            logger.error(f"Ошибка записи кэша {key}: {e}")
+            return
+        self._evict_disk()
+
+    def _evict_disk(self):
+        files = [(os.path.getmtime(p), os.path.getsize(p), p)
+                 for p in (os.path.join(self.directory, n) for n in self._disk_files())]
+        used = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if used <= self.disk_bytes:
+                break
+            os.remove(path)
+            used -= size
+            self.counters["evictions"] += 1
+
+
+class ImageCache:
+    """
+    Картинки по хэшу их входных данных (LRU с бюджетом в байтах).
+    Хэш служит и адресом картинки, и строгим ETag.
+    directory - дисковый уровень (файл <хэш>.png на картинку, бюджет disk_bytes):
+    через него картинку находят все процессы сервера, а не только тот, что ее нарисовал.
+    directory = None или disk_bytes = 0 - только память текущего процесса.
+    """
+
+    def __init__(self, max_bytes=64 * 2**20, url_prefix="/images/", directory=None, disk_bytes=256 * 2**20):
+        self.max_bytes = max_bytes
+        self.url_prefix = url_prefix
+        self.directory = directory if disk_bytes else None
+        self.disk_bytes = disk_bytes
+        self._images = OrderedDict()
+        self._used = 0
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0}
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def __contains__(self, digest):
+        with self._lock:
+            if digest in self._images:
+                return True
+        return self._path(digest) is not None and os.path.exists(self._path(digest))
+
+    def get(self, digest):
+        """Байты PNG или None"""
+        data = self.peek(digest)
+        with self._lock:
+            self.counters["hits" if data is not None else "misses"] += 1
+        return data
+
+    def peek(self, digest):
+        """Байты PNG или None без учета в счетчиках попаданий (для повторного использования при рендере)"""
+        with self._lock:
+            data = self._images.get(digest)
+            if data is not None:
+                self._images.move_to_end(digest)
+                return data
+        data = self._load(digest)
+        if data is not None:
+            with self._lock:
+                self._remember(digest, data)
+        return data
+
+    def put(self, digest, data):
+        with self._lock:
+            self._remember(digest, data)
+        self._save(digest, data)
+
+    def url(self, digest):
+        return f"{self.url_prefix}{digest}.png"
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self._used = 0
+            for name in self._disk_files():
+                _remove(os.path.join(self.directory, name))
+
+    def stats(self):
+        with self._lock:
+            disk_files = self._disk_files()
+            return {**self.counters, "images": len(self._images), "bytes": self._used,
+                    "max_bytes": self.max_bytes, "disk_images": len(disk_files),
+                    "disk_bytes": sum(_size(os.path.join(self.directory, n)) for n in disk_files),
+                    "disk_budget": self.disk_bytes}
+
+    def _remember(self, digest, data):
+        if digest in self._images:
+            self._images.move_to_end(digest)
+            return
+        self._images[digest] = data
+        self._used += len(data)
+        while self._used > self.max_bytes and len(self._images) > 1:
+            _, old = self._images.popitem(last=False)
+            self._used -= len(old)
+            self.counters["evictions"] += 1
+
+    def _path(self, digest):
+        """Файл картинки или None (нет дискового уровня или хэш некорректен)"""
+        if not self.directory or not _DIGEST.match(digest or ""):
+            return None
+        return os.path.join(self.directory, digest + ".png")
+
+    def _disk_files(self):
+        if not self.directory or not os.path.isdir(self.directory):
+            return []
+        return [name for name in os.listdir(self.directory) if name.endswith(".png")]
+
+    def _load(self, digest):
+        path = self._path(digest)
+        if path is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            # Время доступа для LRU на диске
+            os.utime(path)
+            return data
+        except OSError:
+            return None
+
+    def _save(self, digest, data):
+        path = self._path(digest)
+        if path is None or os.path.exists(path):
+            return
+        # Уникальный временный файл: ту же картинку могут записывать несколько процессов
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError as e:
+            logger.error(f"Ошибка записи картинки {digest}: {e}")
+            _remove(tmp)
+            return
+        with self._lock:
+            self._evict_disk()
+
+    def _evict_disk(self):
+        files = [(_mtime(p), _size(p), p) for p in (os.path.join(self.directory, n) for n in self._disk_files())]
+        used = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if used <= self.disk_bytes:
+                break
+            _remove(path)
+            used -= size
+            self.counters["evictions"] += 1
+
+
+# Имя файла картинки - хэш SHA-256 (artifact_hash)
+_DIGEST = re.compile(r"^[0-9a-f]{64}$")
+
+
+def _remove(path):
+    """Удаление файла, который мог уже удалить другой процесс"""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
@@ -0,0 +1,142 @@
+# calibration.py
+# Подбор параметров faks и equations по наблюдаемым кривым Cf(C): ограниченный метод наименьших квадратов
+import time
+
+import numpy as np
+
+from functions import PendRHS
+from metrics import timed_import
+from parameters import PARAMETER_NAMES, flatten, parameter_index, unflatten
+from solvers import dopri_ensemble
+
+
+def parse_observed(observed):
+    """
+    Наблюдения {"C": [M], "Cf": [M x 5]} (null/NaN - нет измерения) в массивы.
+    Возвращает (C, Cf) с C по возрастанию; C должны быть в [0, 1] и без повторов
+    """
+    C = np.asarray(observed["C"], dtype=float)
+    Cf = np.array([[np.nan if v is None else v for v in row] for row in observed["Cf"]], dtype=float)
+    if C.ndim != 1 or Cf.shape != (len(C), 5):
+        raise ValueError("Наблюдения: C - список из M точек, Cf - M строк по 5 значений")
+    if len(C) == 0 or np.any((C < 0) | (C > 1)) or len(np.unique(C)) != len(C):
+        raise ValueError("Точки наблюдений C должны быть различными и лежать в [0, 1]")
+    if not np.isfinite(Cf).any():
+        raise ValueError("Нет ни одного измерения Cf")
+    order = np.argsort(C)
+    return C[order], Cf[order]
+
+
+def parse_bounds(names, values, bounds):
+    """Границы (low, high) для выбранных параметров; bounds - {имя: [low, high]}, null - без границы"""
+    low = np.full(len(names), -np.inf)
+    high = np.full(len(names), np.inf)
+    for name, (lo, hi) in (bounds or {}).items():
+        if name not in names:
+            raise ValueError(f"Границы заданы для параметра, который не подбирается: {name}")
+        k = names.index(name)
+        low[k] = -np.inf if lo is None else float(lo)
+        high[k] = np.inf if hi is None else float(hi)
+    if np.any(low >= high):
+        raise ValueError("Нижняя граница параметра должна быть меньше верхней")
+    # Начальная точка least_squares должна лежать строго внутри границ
+    span = np.where(np.isfinite(high - low), high - low, 1.0)
+    start = np.clip(values, low + 1e-9 * span, high - 1e-9 * span)
+    return low, high, start
+
+
+def calibrate(initial_equations, faks, equations, time_value, observed, names=None, bounds=None,
+              weights=None, xm=None, rel_step=1e-5, max_nfev=50, rtol=1e-10, atol=1e-10):
+    """
+    Подбор параметров names (по умолчанию все) по наблюдениям observed (см. parse_observed).
+    Невязки - (Cf модели - Cf наблюдений)·weights[i] в точках наблюдений.
+    Каждое вычисление невязок - один расчет, матрица Якоби - прямые разности
+    по всем параметрам одним пакетом (базовый сценарий и P возмущенных, dopri_ensemble).
+    Возвращает словарь: names, initial, values, faks, equations (подобранные),
+    std_errors, cost, rmse, rmse_by_output, residuals, success, message,
+    nfev, njev, solves, members, seconds, solve_seconds
+    """
+    start = time.perf_counter()
+    if xm is None:
+        xm = [1.0, 1.0, 1.0, 1.0, 1.0]
+    names = PARAMETER_NAMES if names is None else list(names)
+    index = parameter_index(names)
+    if len(set(index)) != len(index):
+        raise ValueError("Параметры для подбора повторяются")
+
+    C_obs, Cf_obs = parse_observed(observed)
+    weights = np.ones(5) if weights is None else np.asarray(weights, dtype=float)
+    measured = np.isfinite(Cf_obs)
+    # Сетка расчета начинается с C=0 (там заданы начальные условия)
+    C = np.union1d([0.0], C_obs)
+    rows = np.searchsorted(C, C_obs)
+
+    base = flatten(faks, equations)
+    low, high, x0 = parse_bounds(names, base[index], bounds)
+    y0 = np.asarray(initial_equations, dtype=float)
+    counters = {"solves": 0, "members": 0, "solve_seconds": 0.0}
+
+    def solve(chosen):
+        """Траектории в точках наблюдений для строк chosen [N x P]: [N x M x 5]"""
+        vectors = np.tile(base, (len(chosen), 1))
+        vectors[:, index] = chosen
+        solve_start = time.perf_counter()
+        rhs = PendRHS.stack([PendRHS(*unflatten(vector), xm, time_value) for vector in vectors])
+        trajectories = dopri_ensemble(rhs, np.broadcast_to(y0, (len(vectors), 5)), C, rtol=rtol, atol=atol)
+        counters["solves"] += 1
+        counters["members"] += len(vectors)
+        counters["solve_seconds"] += time.perf_counter() - solve_start
+        return trajectories[:, rows]
+
+    def residuals_of(trajectories):
+        return ((trajectories - Cf_obs) * weights)[..., measured]
+
+    def fun(x):
+        return residuals_of(solve(x[None]))[0]
+
+    def jac(x):
+        # Шаг внутрь границ: у верхней границы разность берется назад
+        h = rel_step * np.maximum(np.abs(x), 1.0)
+        h = np.where(x + h > high, -h, h)
+        probes = np.vstack([x, x + np.diag(h)])
+        residuals = residuals_of(solve(probes))
+        return ((residuals[1:] - residuals[0]) / h[:, None]).T
+
+    least_squares = timed_import("scipy.optimize").least_squares
+    fit = least_squares(fun, x0, jac=jac, bounds=(low, high), max_nfev=max_nfev, x_scale="jac")
+
+    residuals = fit.fun
+    dof = len(residuals) - len(names)
+    std_errors = np.full(len(names), np.nan)
+    if dof > 0:
+        covariance = np.linalg.pinv(fit.jac.T @ fit.jac) * (2.0 * fit.cost / dof)
+        std_errors = np.sqrt(np.maximum(np.diag(covariance), 0.0))
+
+    fitted = base.copy()
+    fitted[index] = fit.x
+    fitted_faks, fitted_equations = unflatten(fitted)
+    errors = np.full(Cf_obs.shape, np.nan)
+    errors[measured] = residuals
+    with np.errstate(invalid="ignore"):
+        rmse_by_output = np.sqrt(np.nanmean(errors ** 2, axis=0))
+
+    return {
+        "names": names,
+        "initial": base[index],
+        "values": fit.x,
+        "faks": fitted_faks,
+        "equations": fitted_equations,
+        "std_errors": std_errors,
+        "cost": float(fit.cost),
+        "rmse": float(np.sqrt(np.mean(residuals ** 2))),
+        "rmse_by_output": rmse_by_output,
+        "residuals": errors,
+        "success": bool(fit.success),
+        "message": fit.message,
+        "nfev": int(fit.nfev),
+        "njev": int(fit.njev or 0),
+        "solves": counters["solves"],
+        "members": counters["members"],
+        "solve_seconds": counters["solve_seconds"],
+        "seconds": time.perf_counter() - start,
+    }
@@ -0,0 +1,43 @@
+# data_formats.py
+# Кодирование массивов результатов для /data: JSON, float32 и npz
+import io
+import json
+
+import numpy as np
+
+FORMATS = ("json", "f32", "npz")
+
+
+def layout(arrays):
+    """Раскладка массивов в бинарном ответе: имя, форма, смещение (в числах float32)"""
+    result = []
+    offset = 0
+    for name, value in arrays.items():
+        shape = list(np.shape(value))
+        result.append({"name": name, "shape": shape, "offset": offset})
+        offset += int(np.prod(shape, dtype=int))
+    return result
+
+
+def to_json(arrays):
+    """Массивы списками; NaN (нет значения) - null"""
+    result = {}
+    for name, value in arrays.items():
+        value = np.asarray(value, dtype=float)
+        result[name] = np.where(np.isnan(value), None, value).tolist()
+    return result
+
+
+def to_f32(arrays):
+    """Все массивы подряд, float32 little-endian, в порядке layout(arrays)"""
+    return b"".join(np.ascontiguousarray(value, dtype="<f4").tobytes() for value in arrays.values())
+
+
+def to_npz(arrays):
+    buffer = io.BytesIO()
+    np.savez(buffer, **{name: np.asarray(value) for name, value in arrays.items()})
+    return buffer.getvalue()
+
+
+def layout_header(arrays):
+    return json.dumps(layout(arrays), separators=(",", ":"))
@@ -388,32 +388,368 @@ def f12_cf1_norm(cf1, a=0.5, b=3.0):
 def f12_cf1_default_norm(cf1):
     return f12_cf1_norm(cf1, 0.5, 3.0)
 
+# === ВЕКТОРИЗОВАННАЯ ПРАВАЯ ЧАСТЬ (аналог pend на массивах NumPy) ===
+
+# Номера возмущений (с нуля), входящих в положительную и отрицательную сумму каждого уравнения
+POS_TERMS = [
+    [0, 3, 4, 6, 7, 8, 9, 10, 11, 12],
+    [0, 3, 8, 9, 11],
+    [0, 3, 4, 6, 7, 8, 9, 10, 11],
+    [0, 3, 4, 6, 7, 8, 9, 10, 11, 12],
+    [0, 4],
+]
+NEG_TERMS = [
+    [1, 2, 5, 13],
+    [1, 2, 4, 5],
+    [1, 2, 5, 13],
+    [1, 2, 5, 13],
+    [1, 2, 3, 5, 6, 7, 8, 9, 12, 13],
+]
+POS_DIVISORS = [8.0, 6.0, 9.0, 10.0, 2.5]
+NEG_DIVISORS = [4.0, 4.0, 4.0, 4.0, 12.0]
+
+# Параметры внутренних функций по умолчанию (те же, что в f*_default_norm)
+F_DEFAULTS = [
+    [0.5, 0.5],
+    [0.3, 15.0],
+    [0.3, 0.4, 0.5],
+    [0.7, 11.0],
+    [0.8, 9.0],
+    [0.8, 12.0],
+    [0.8, 11.0],
+    [0.7, 13.0],
+    [8.0, 4.0],
+    [0.55, 13.0],
+    [0.55, 12.0, 2.0],
+    [0.5, 3.0],
+]
+
+
+def terms_matrix(terms, count=14):
+    """Матрица [5 x count] из 0/1: какие возмущения входят в сумму уравнения"""
+    m = np.zeros((len(terms), count))
+    for i, idx in enumerate(terms):
+        m[i, idx] = 1.0
+    return m
+
+
+# Матрица сумм возмущений [14 x 10] с учетом делителей soft_norm:
+# столбцы 0-4 - положительные, 5-9 - отрицательные суммы уравнений
+_SUMS_MATRIX = (np.vstack([terms_matrix(POS_TERMS), terms_matrix(NEG_TERMS)]).T
+                / np.array(POS_DIVISORS + NEG_DIVISORS))
+
+
+def fak_coefficients(faks, count=14):
+    """Коэффициенты a, b возмущений в виде массивов и маска заданных возмущений"""
+    a = np.zeros(count)
+    b = np.zeros(count)
+    valid = np.zeros(count, dtype=bool)
+    for k in range(min(count, len(faks))):
+        if len(faks[k]) >= 2:
+            a[k], b[k] = faks[k][0], faks[k][1]
+            valid[k] = True
+    return a, b, valid
+
+
+def fx_linear_array(x, a, b):
+    """Векторный аналог fx_linear для массивов коэффициентов a, b"""
+    value = a * x + b
+    max_possible = np.abs(a) * 2.0 + np.abs(b)
+    ok = max_possible > 0
+    return np.where(ok, np.clip(value / np.where(ok, max_possible, 1.0), 0.0, 1.0), 0.5)
+
+
+def equation_params(f, k):
+    """Параметры k-й внутренней функции: из f, если их хватает, иначе по умолчанию"""
+    n = len(F_DEFAULTS[k])
+    if len(f) > k and len(f[k]) >= n:
+        return [float(v) for v in f[k][:n]]
+    return list(F_DEFAULTS[k])
+
+
+class DisturbanceTable:
+    """
+    Таблица возмущений x1-x14 на один расчет (для графика возмущений и /data).
+    x1-x6 зависят только от t и вычисляются один раз.
+    x7-x14 - кусочно-линейные функции C с изломами там, где a·C + b равно 0
+    или max_possible, поэтому их значения точно восстанавливаются
+    линейной интерполяцией по узлам-изломам.
+    За пределами крайних изломов все возмущения постоянны.
+    """
+
+    def __init__(self, faks, t=0.0, C=None):
+        a, b, valid = fak_coefficients(faks)
+        self.valid = valid
+        self.time_value = float(t)
+
+        # Уровни fx_linear (без деления на 5) для x1-x6
+        self.time_levels = np.where(valid[:6], fx_linear_array(self.time_value, a[:6], b[:6]), 0.0)
+
+        # Узлы: границы сетки C и все изломы x7-x14
+        bounds = [0.0, 1.0] if C is None else [float(np.min(C)), float(np.max(C))]
+        ca, cb = a[6:], b[6:]
+        max_possible = np.abs(ca) * 2.0 + np.abs(cb)
+        kinks = []
+        for k in np.flatnonzero(valid[6:] & (ca != 0) & (max_possible > 0)):
+            kinks += [-cb[k] / ca[k], (max_possible[k] - cb[k]) / ca[k]]
+        self.knots = np.unique(np.array(bounds + kinks))
+        if len(self.knots) == 1:
+            self.knots = np.array([self.knots[0], self.knots[0] + 1.0])
+
+        # Уровни всех 14 возмущений в узлах
+        levels = np.empty((len(self.knots), 14))
+        levels[:, :6] = self.time_levels
+        levels[:, 6:] = np.where(valid[6:], fx_linear_array(self.knots[:, None], ca, cb), 0.0)
+        self.levels = levels
+
+    def levels_at(self, C):
+        """Уровни fx_linear возмущений x1-x14 в точках C: массив [len(C) x 14]"""
+        C = np.clip(np.asarray(C, dtype=float), self.knots[0], self.knots[-1])
+        i = np.clip(np.searchsorted(self.knots, C, side="right") - 1, 0, len(self.knots) - 2)
+        left, right = self.levels[i], self.levels[i + 1]
+        w = ((C - self.knots[i]) / (self.knots[i + 1] - self.knots[i]))[..., None]
+        return left + w * (right - left)
+
+
+class PendRHS:
+    """
+    Правая часть системы pend, собранная один раз на расчет.
+    Коэффициенты возмущений и внутренних функций хранятся массивами,
+    возмущения x1-x6 вычисляются при создании (t не меняется при интегрировании по C).
+    Вызов rhs(x, C) совместим с odeint и дает тот же результат, что pend.
+    """
+    eps = 1e-4
+
+    # Раскладка массива внутренних функций (см. functions):
+    # 0-5: линейные f2, f4, f5, f8, f10, f12 (аргументы Cf4, Cf3, Cf4, Cf1, Cf3, Cf1),
+    # 6: константа 1 (для уравнений без внутренних функций)
+    # 7-9: дробные f6, f7, f11 (аргумент Cf5)
+    # 10-11: экспоненциальные f1 (Cf3), f9 (Cf2); 12: ступенчатая f3 (Cf5)
+    _LIN_ARGS = np.array([3, 2, 3, 0, 2, 0, 0])
+    _EXP_ARGS = np.array([2, 1])
+    # Аргумент каждой функции раскладки G (для константы и f3 производная нулевая)
+    _G_ARGS = np.array([3, 2, 3, 0, 2, 0, 0, 4, 4, 4, 2, 1, 4])
+    _LIN_INDEX = [1, 3, 4, 7, 9, 11]
+    _FRAC_INDEX = [5, 6, 10]
+    _FRAC_SCALE = [1.2, 1.2, 1.1]
+    # dCf/dC = G[a]·G[b]·G[c]·(полож. сумма) - G[d]·(отриц. сумма)
+    _TERMS = np.array([10, 1, 6, 3, 5] + [0, 2, 6, 11, 6] + [6, 6, 6, 4, 6] + [12, 7, 8, 9, 6])
+    # Для производных: [20 x 5], единица там, где сомножитель _TERMS зависит от Cf_j
+    _TERM_ARGS = (_G_ARGS[_TERMS][:, None] == np.arange(5)).astype(float)
+    _BIG = 1e300
+
+    def __init__(self, faks, f, xm, t=0.0, power=0.8):
+        self.power = power
+        a, b, valid = fak_coefficients(faks)
+
+        # x1-x6: константы на весь расчет
+        t = np.asarray(t, dtype=float)[..., None]
+        levels_t = np.where(valid[:6], np.clip(fx_linear_array(t, a[:6], b[:6]) / 5.0, 0.0, 1.0), 0.0)
+        self._sum_t = levels_t @ _SUMS_MATRIX[:6]
+        self._sum_c = _SUMS_MATRIX[6:]
+
+        # x7-x14: clip(a'·C + b', 0, 0.2), где a', b' уже поделены на нормировку fx_linear и на 5
+        ca, cb = a[6:], b[6:]
+        max_possible = np.abs(ca) * 2.0 + np.abs(cb)
+        ok = max_possible > 0
+        scale = np.where(ok, 1.0 / np.where(ok, max_possible, 1.0), 0.0) / 5.0
+        self._ca = np.where(valid[6:], ca * scale, 0.0)
+        self._cb = np.where(valid[6:], np.where(ok, cb * scale, 0.1), 0.0)
+
+        # Линейные функции: a'·Cf + b'
+        lin = np.array([equation_params(f, k) for k in self._LIN_INDEX])
+        den = np.abs(lin[:, 0]) * 2.0 + np.abs(lin[:, 1])
+        ok = den > 0
+        inv_den = 1.0 / np.where(ok, den, 1.0)
+        self._lin_a = np.append(np.where(ok, lin[:, 0] * inv_den, 0.0), 0.0)
+        self._lin_b = np.append(np.where(ok, lin[:, 1] * inv_den, 0.5), 1.0)
+
+        # Дробные функции: (a / max(0.01, Cf5 + b) + c) · s, множитель s внесен в a и c
+        frac = []
+        for k, mult in zip(self._FRAC_INDEX, self._FRAC_SCALE):
+            fa, fb, fc = (equation_params(f, k) + [0.0])[:3]
+            if k == 10:
+                max_val = (fa / fb + fc) if fb > 0 else (fa / 0.01 + fc)
+            else:
+                max_val = fa / fb if fb > 0 else 10.0
+            if max_val > 0:
+                frac.append([fa * mult / max_val, fb, fc * mult / max_val])
+            else:
+                frac.append([0.0, fb, 0.5])
+        self._frac_a, self._frac_b, self._frac_c = np.array(frac).T.copy()
+
+        # f1 и f9: A / (B + K·exp(L - S·Cf))
+        f1_a, f1_b = equation_params(f, 0)
+        f9_scale, f9_shift = equation_params(f, 8)
+        self._exp_A = np.array([1.2 * f1_a, 1.0])
+        self._exp_B = np.array([f1_b, 1.0])
+        self._exp_K = np.array([1.0 - f1_b, 1.0])
+        self._exp_L = np.array([0.0, f9_shift])
+        self._exp_S = np.array([1.0, f9_scale])
+
+        # f3: low при Cf5 < threshold, иначе high
+        low, threshold, high = equation_params(f, 2)
+        low, high = min(1.0, max(0.0, low)), min(1.0, max(0.0, high))
+        self._f3_threshold = np.array([threshold])
+        self._f3_low = np.array([low])
+        self._f3_step = np.array([high - low])
+
+        xm = np.asarray(xm, dtype=float)
+        self._inv_xm = 1.0 / xm
+        self.top = np.minimum(xm - self.eps, 1.0 - self.eps)
+
+        # Массив t: пакет по времени (как после stack), x1-x6 посчитаны сразу для всех t,
+        # остальные коэффициенты общие и только расширяются по первой оси
+        batch = t.shape[:-1]
+        if batch:
+            for name, value in list(vars(self).items()):
+                if name not in self._SHARED and name != "_sum_t":
+                    setattr(self, name, np.broadcast_to(value, batch + np.shape(value)))
+
+    # Общие для всех сценариев поля (не складываются в stack)
+    _SHARED = ("power", "_sum_c")
+
+    @classmethod
+    def stack(cls, rhs_list):
+        """
+        Объединение N правых частей в одну для пакетного расчета.
+        Коэффициенты складываются по новой первой оси, вызов принимает x формы [N x 5].
+        """
+        first = rhs_list[0]
+        if any(r.power != first.power for r in rhs_list):
+            raise ValueError("Все сценарии пакета должны иметь одинаковый power")
+        stacked = cls.__new__(cls)
+        for name, value in vars(first).items():
+            if name in cls._SHARED:
+                setattr(stacked, name, value)
+            else:
+                setattr(stacked, name, np.stack([getattr(r, name) for r in rhs_list]))
+        return stacked
+
+    def subset(self, index):
+        """Правая часть для части сценариев пакета, собранного через stack"""
+        part = self.__class__.__new__(self.__class__)
+        for name, value in vars(self).items():
+            setattr(part, name, value if name in self._SHARED else value[index])
+        return part
+
+    def functions(self, x):
+        """Значения 12 внутренних функций (и константы 1) в раскладке G"""
+        xs = np.minimum(np.maximum(x, self.eps), 1.0 - self.eps)
+        cf5 = xs[..., 4:5]
+
+        lin = self._lin_a * xs.take(self._LIN_ARGS, axis=-1) + self._lin_b
+        frac = self._frac_a / np.maximum(0.01, cf5 + self._frac_b) + self._frac_c
+        u = xs.take(self._EXP_ARGS, axis=-1)
+        expo = self._exp_A / (self._exp_B + self._exp_K * np.exp(self._exp_L - self._exp_S * u))
+        f3 = self._f3_low + self._f3_step * (cf5 >= self._f3_threshold)
+
+        values = np.concatenate([lin, frac, expo, f3], axis=-1)
+        return np.minimum(np.maximum(values, 0.0), 1.0)
+
+    def function_slopes(self, x):
+        """
+        Значения функций G и их производные по своим аргументам (_G_ARGS).
+        Производная равна 0 там, где функция или ее аргумент обрезаны
+        (ограничение [0, 1], знаменатель дробной функции 0.01, ступенька f3)
+        """
+        xs = np.minimum(np.maximum(x, self.eps), 1.0 - self.eps)
+        cf5 = xs[..., 4:5]
+
+        lin = self._lin_a * xs.take(self._LIN_ARGS, axis=-1) + self._lin_b
+        lin_slope = np.broadcast_to(self._lin_a, lin.shape)
+
+        den = cf5 + self._frac_b
+        frac_den = np.maximum(0.01, den)
+        frac = self._frac_a / frac_den + self._frac_c
+        frac_slope = np.where(den > 0.01, -self._frac_a / frac_den ** 2, 0.0)
+
+        u = xs.take(self._EXP_ARGS, axis=-1)
+        e = self._exp_K * np.exp(self._exp_L - self._exp_S * u)
+        q = self._exp_B + e
+        expo = self._exp_A / q
+        expo_slope = self._exp_A * self._exp_S * e / q ** 2
+
+        f3 = self._f3_low + self._f3_step * (cf5 >= self._f3_threshold)
+
+        values = np.concatenate([lin, frac, expo, f3], axis=-1)
+        slopes = np.concatenate([lin_slope, frac_slope, expo_slope, np.zeros_like(f3)], axis=-1)
+        inside = (values > 0.0) & (values < 1.0)
+        arg = x.take(self._G_ARGS, axis=-1)
+        inside &= (arg > self.eps) & (arg < 1.0 - self.eps)
+        return np.minimum(np.maximum(values, 0.0), 1.0), slopes * inside
+
+    def derivatives_jacobian(self, x, C):
+        """
+        Матрица Якоби derivatives по x: [..., 5, 5], элемент [i, j] = d(dCf_i/dC)/dCf_j.
+        Суммы возмущений от x не зависят, поэтому дифференцируются только
+        произведение G[a]·G[b]·G[c] и вычитаемое G[d]
+        """
+        norm = self.sums(C)
+        G, slopes = self.function_slopes(x)
+        H = G.take(self._TERMS, axis=-1)
+        dH = slopes.take(self._TERMS, axis=-1)[..., None] * self._TERM_ARGS
+        a, b, c, d = H[..., 0:5], H[..., 5:10], H[..., 10:15], H[..., 15:20]
+        positive = (dH[..., 0:5, :] * (b * c)[..., None] + dH[..., 5:10, :] * (a * c)[..., None]
+                    + dH[..., 10:15, :] * (a * b)[..., None])
+        jac = positive * norm[..., :5, None] - dH[..., 15:20, :] * norm[..., 5:, None]
+        return jac * self._inv_xm[..., None]
+
+    def jacobian(self, x, C):
+        """
+        Матрица Якоби правой части __call__ (Dfun для odeint): строки переменных,
+        производные которых обрезаны граничными условиями, нулевые
+        """
+        jac = self.derivatives_jacobian(x, C)
+        d = self.derivatives(x, C)
+        clamped = ((x >= self.top) & (d > 0)) | ((x <= self.eps) & (d < 0))
+        return np.where(clamped[..., None], 0.0, jac)
+
+    def sums(self, C):
+        """Нормированные положительные (0-4) и отрицательные (5-9) суммы возмущений"""
+        levels_c = np.minimum(np.maximum(self._ca * C + self._cb, 0.0), 0.2)
+        total = self._sum_t + levels_c @ self._sum_c
+        return np.minimum(1.0, total ** self.power)
+
+    def derivatives(self, x, C):
+        """Производные без граничных условий (для решателей с событиями на границах)"""
+        norm = self.sums(C)
+        H = self.functions(x).take(self._TERMS, axis=-1)
+        return (H[..., 0:5] * H[..., 5:10] * H[..., 10:15] * norm[..., :5]
+                - H[..., 15:20] * norm[..., 5:]) * self._inv_xm
+
+    def __call__(self, x, C):
+        d = self.derivatives(x, C)
+
+        # Граничные условия: на пределе производная не выводит за [eps, xm]
+        upper = (x < self.top) * self._BIG
+        lower = (x > self.eps) * -self._BIG
+        return np.minimum(np.maximum(d, lower), upper)
+
+
 def calculate_total_loss(Cf_values, weights=None):
     """
     Расчет суммарных потерь по формуле (2.9) из документа
-    Cf_values = [Cf1, Cf2, Cf3, Cf4, Cf5]
-    weights = [μ1, μ2, μ3, μ4, μ5] - весовые коэффициенты
+    Cf_values = [Cf1, Cf2, Cf3, Cf4, Cf5] или массив (..., 5): траектория [len(C) x 5],
+    пакет расчетов [N x len(C) x 5] - потери считаются сразу для всех точек
+    weights = [μ1, μ2, μ3, μ4, μ5] - весовые коэффициенты (или массив, совместимый с Cf_values)
+    Для одного набора Cf возвращает число, иначе массив формы Cf_values без последней оси
     """
-    if weights is None:
-        weights = [0.2, 0.2, 0.2, 0.2, 0.2]
-    
-    total_loss = 0.0
-    for i in range(min(len(Cf_values), len(weights))):
-        total_loss += weights[i] * Cf_values[i]
-    
-    return max(0.0, min(1.0, total_loss))
+    Cf_values = np.asarray(Cf_values, dtype=float)
+    weights = np.full(5, 0.2) if weights is None else np.asarray(weights, dtype=float)
+    n = min(Cf_values.shape[-1], weights.shape[-1])
+    total_loss = np.clip((Cf_values[..., :n] * weights[..., :n]).sum(axis=-1), 0.0, 1.0)
+    return float(total_loss) if total_loss.ndim == 0 else total_loss
 
 def normalize_values(values, max_values=None):
+    """
+    Нормировка values / max_values с ограничением [0, 1] (для max <= 0 - без деления).
+    values - массив (..., K), max_values - совместимый с ним массив (по умолчанию единицы)
+    """
+    values = np.asarray(values, dtype=float)
     if max_values is None:
-        max_values = [1.0] * len(values)
-    
-    normalized = []
-    for i in range(len(values)):
-        if max_values[i] > 0:
-            norm_val = values[i] / max_values[i]
-        else:
-            norm_val = values[i]
-        norm_val = max(0.0, min(1.0, norm_val))
-        normalized.append(norm_val)
-    
-    return normalized
\ No newline at end of file
+        return np.clip(values, 0.0, 1.0)
+    max_values = np.asarray(max_values, dtype=float)
+    positive = max_values > 0
+    normalized = np.where(positive, values / np.where(positive, max_values, 1.0), values)
+    return np.clip(normalized, 0.0, 1.0)
@@ -0,0 +1,137 @@
+# jobs.py
+# Фоновые задания: расчет и рендер вне потока запроса, статус по id
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "error"
+
+_JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+class JobQueue:
+    """
+    Очередь заданий на пуле потоков.
+    workers=1 по умолчанию: расчеты выполняются по одному, но не в потоке запроса.
+    Рендер в любом случае идет по одному (process_ecology.renders): pyplot
+    и разбор mathtext в matplotlib не потокобезопасны.
+    Хранятся последние max_jobs заданий.
+    directory - каталог, куда записывается состояние каждого задания (<id>.json):
+    статус задания, поставленного одним процессом сервера, отдает любой другой.
+    Результат задания должен сериализоваться в JSON.
+    """
+
+    def __init__(self, workers=1, max_jobs=200, directory=None):
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self.max_jobs = max_jobs
+        self.directory = directory
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def submit(self, func, *args, **kwargs):
+        """Поставить func(*args, **kwargs) в очередь; возвращает id задания"""
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._jobs[job_id] = {
+                "id": job_id,
+                "status": QUEUED,
+                "submitted": time.time(),
+                "started": None,
+                "finished": None,
+                "result": None,
+                "error": None,
+            }
+            self._save(self._jobs[job_id])
+            while len(self._jobs) > self.max_jobs:
+                oldest = next(iter(self._jobs))
+                if self._jobs[oldest]["status"] in (QUEUED, RUNNING):
+                    break
+                self._jobs.pop(oldest)
+            self._prune_disk()
+        self._executor.submit(self._run, job_id, func, args, kwargs)
+        return job_id
+
+    def get(self, job_id):
+        """Копия состояния задания (своего или, через directory, другого процесса) или None"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return dict(job)
+        return self._load(job_id)
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _update(self, job_id, **fields):
+        with self._lock:
+            self._jobs[job_id].update(fields)
+            self._save(self._jobs[job_id])
+
+    def _path(self, job_id):
+        if not self.directory or not _JOB_ID.match(job_id or ""):
+            return None
+        return os.path.join(self.directory, job_id + ".json")
+
+    def _save(self, job):
+        path = self._path(job["id"])
+        if path is None:
+            return
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(job, f, ensure_ascii=False)
+            os.replace(tmp, path)
+        except (OSError, TypeError, ValueError) as e:
+            logger.error(f"Ошибка записи задания {job['id']}: {e}")
+
+    def _load(self, job_id):
+        path = self._path(job_id)
+        if path is None:
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _prune_disk(self):
+        """В каталоге остаются max_jobs последних заданий (и все незавершенные задания этого процесса)"""
+        if not self.directory:
+            return
+        active = {job_id for job_id, job in self._jobs.items() if job["status"] in (QUEUED, RUNNING)}
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".json") and name[:-5] not in active:
+                path = os.path.join(self.directory, name)
+                try:
+                    files.append((os.path.getmtime(path), path))
+                except OSError:
+                    pass
+        for _, path in sorted(files)[:max(0, len(files) - self.max_jobs)]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _run(self, job_id, func, args, kwargs):
+        self._update(job_id, status=RUNNING, started=time.time())
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            logger.error(f"Ошибка в задании {job_id}: {e}")
+            self._update(job_id, status=FAILED, error=str(e), finished=time.time())
+        else:
+            self._update(job_id, status=DONE, result=result, finished=time.time())
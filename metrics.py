@@ -0,0 +1,199 @@
+# metrics.py
+# Замеры этапов расчета: таймеры, счетчики, гистограммы для /metrics (формат Prometheus),
+# заголовок Server-Timing и профилирование cProfile по запросу
+import cProfile
+import importlib
+import os
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+# Границы корзин гистограмм, секунды
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Время первого импорта тяжелых модулей (timed_import), секунды
+IMPORT_SECONDS = {}
+
+# Этапы текущего запроса или задания: список (имя, секунды) или None вне collect()
+_timings = ContextVar("timings", default=None)
+
+
+class Registry:
+    """Счетчики и гистограммы с метками; потокобезопасно"""
+
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+        self._lock = threading.Lock()
+
+    def describe(self, name, text):
+        self._help[name] = text
+
+    def inc(self, name, labels=None, value=1):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, labels, seconds):
+        key = (name, _label_key(labels))
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    hist["buckets"][i] += 1
+            hist["sum"] += seconds
+            hist["count"] += 1
+
+    def render(self, extra=()):
+        """Текст в формате Prometheus; extra - дополнительные (имя, метки, значение) как gauge"""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items())
+
+        seen = set()
+        for (name, labels), value in counters:
+            if name not in seen:
+                seen.add(name)
+                lines += self._header(name, "counter")
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+
+        for (name, labels), hist in histograms:
+            if name not in seen:
+                seen.add(name)
+                lines += self._header(name, "histogram")
+            for bound, count in zip(self.buckets, hist["buckets"]):
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', repr(bound)),))} {count}")
+            lines.append(f"{name}_bucket{_format_labels(labels + (('le', '+Inf'),))} {hist['count']}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {hist['sum']}")
+            lines.append(f"{name}_count{_format_labels(labels)} {hist['count']}")
+
+        for name, labels, value in extra:
+            if name not in seen:
+                seen.add(name)
+                lines += self._header(name, "gauge")
+            lines.append(f"{name}{_format_labels(_label_key(labels))} {value}")
+        return "\n".join(lines) + "\n"
+
+    def _header(self, name, kind):
+        header = [f"# HELP {name} {self._help[name]}"] if name in self._help else []
+        return header + [f"# TYPE {name} {kind}"]
+
+
+def _label_key(labels):
+    return tuple(sorted((labels or {}).items()))
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    text = ",".join(f'{k}="{str(v)}"' for k, v in labels)
+    return "{" + text + "}"
+
+
+REGISTRY = Registry()
+REGISTRY.describe("ecology_stage_seconds", "Длительность этапов расчета и рендера")
+REGISTRY.describe("ecology_request_seconds", "Длительность HTTP-запросов")
+REGISTRY.describe("ecology_rhs_calls_total", "Вычисления правой части системы")
+REGISTRY.describe("ecology_solves_total", "Решения системы")
+
+
+@contextmanager
+def stage(name):
+    """Таймер этапа: гистограмма ecology_stage_seconds и список этапов текущего collect()"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        REGISTRY.observe("ecology_stage_seconds", {"stage": name}, elapsed)
+        timings = _timings.get()
+        if timings is not None:
+            timings.append((name, elapsed))
+
+
+def observe_stages(timings):
+    """
+    Этапы, замеренные в другом процессе (пул /batch), в гистограмму ecology_stage_seconds:
+    у процессов пула свой REGISTRY, который /metrics не видит
+    """
+    for name, seconds in timings:
+        REGISTRY.observe("ecology_stage_seconds", {"stage": name}, seconds)
+
+
+def timed_import(name):
+    """
+    importlib.import_module с замером первого импорта модуля в IMPORT_SECONDS
+    (время включает зависимости, которые еще не были загружены)
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    IMPORT_SECONDS[name] = time.perf_counter() - start
+    return module
+
+
+@contextmanager
+def collect():
+    """Сбор этапов внутри блока (запрос, задание); отдает список (имя, секунды)"""
+    timings = []
+    token = _timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _timings.reset(token)
+
+
+def start_collect():
+    """collect() для хуков before/after_request: возвращает (токен, список этапов)"""
+    timings = []
+    return _timings.set(timings), timings
+
+
+def stop_collect(token):
+    _timings.reset(token)
+
+
+def count_solve(stats):
+    """Учет решения: число вычислений правой части из статистики решателя"""
+    REGISTRY.inc("ecology_solves_total", {"solver": stats["solver"]})
+    REGISTRY.inc("ecology_rhs_calls_total", {"solver": stats["solver"]}, stats["nfev"])
+
+
+def server_timing(timings, total=None):
+    """Значение заголовка Server-Timing: этапы по порядку, длительность в мс"""
+    parts = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in timings]
+    if total is not None:
+        parts.append(f"total;dur={total * 1000:.1f}")
+    return ", ".join(parts)
+
+
+def timings_ms(timings):
+    """Этапы словарем {имя: мс} (одинаковые имена суммируются)"""
+    result = {}
+    for name, seconds in timings:
+        result[name] = result.get(name, 0.0) + seconds * 1000
+    return result
+
+
+@contextmanager
+def profiled(directory, name):
+    """cProfile на время блока; результат - файл directory/name-<время>.prof (путь отдается блоку)"""
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, f"{name}-{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}.prof")
+    profile = cProfile.Profile()
+    profile.enable()
+    try:
+        yield path
+    finally:
+        profile.disable()
+        profile.dump_stats(path)
@@ -0,0 +1,87 @@
+# monte_carlo.py
+# Распространение неопределенности параметров: выборки, пакетные расчеты и перцентили Cf1-Cf5 по C
+import numpy as np
+
+from functions import PendRHS
+from parameters import flatten, parameter_index, unflatten
+from solvers import dopri_ensemble
+
+DISTRIBUTIONS = ("uniform", "normal", "triangular")
+PERCENTILES = (5, 50, 95)
+
+
+def sample_parameters(values, spec, size, rng):
+    """
+    Выборка векторов параметров [size x P].
+    values - базовый вектор (parameters.flatten), spec - {имя параметра: распределение}:
+    {"dist": "uniform", "low", "high"},
+    {"dist": "normal", "mean" (по умолчанию базовое значение), "std"},
+    {"dist": "triangular", "low", "mode" (по умолчанию базовое значение), "high"}.
+    Параметры без распределения остаются равными базовым значениям.
+    """
+    samples = np.tile(np.asarray(values, dtype=float), (size, 1))
+    for name, dist in spec.items():
+        k = parameter_index([name])[0]
+        kind = dist.get("dist", "uniform")
+        if kind == "uniform":
+            samples[:, k] = rng.uniform(float(dist["low"]), float(dist["high"]), size)
+        elif kind == "normal":
+            samples[:, k] = rng.normal(float(dist.get("mean", values[k])), float(dist["std"]), size)
+        elif kind == "triangular":
+            samples[:, k] = rng.triangular(float(dist["low"]), float(dist.get("mode", values[k])),
+                                           float(dist["high"]), size)
+        else:
+            raise ValueError(f"Неизвестное распределение {kind} (доступны: {', '.join(DISTRIBUTIONS)})")
+    return samples
+
+
+def solve_batch(vectors, initial_equations, time_value, C, xm, rtol=1e-8, atol=1e-8):
+    """Пакетный расчет для векторов параметров: массив [N x len(C) x 5]"""
+    rhs = PendRHS.stack([PendRHS(*unflatten(vector), xm, time_value) for vector in vectors])
+    y0 = np.broadcast_to(np.asarray(initial_equations, dtype=float), (len(vectors), 5))
+    return dopri_ensemble(rhs, y0, C, rtol=rtol, atol=atol)
+
+
+def monte_carlo(initial_equations, faks, equations, time_value, spec, samples=2000, batch_size=250,
+                seed=0, C=None, xm=None, percentiles=PERCENTILES, executor=None):
+    """
+    Монте-Карло по распределениям spec (см. sample_parameters).
+    Выборка строится сразу (ошибки в spec - ValueError здесь же), решение идет
+    пакетами по batch_size: возвращается генератор промежуточных результатов
+    {"done", "samples", "C", "percentiles", "bands", "mean"}, где bands - перцентили
+    Cf1-Cf5 по всем уже решенным выборкам [len(percentiles) x len(C) x 5].
+    executor - пул процессов: пакеты решаются параллельно и выдаются по порядку.
+    """
+    if C is None:
+        C = np.linspace(0, 1, 100)
+    if xm is None:
+        xm = [1.0, 1.0, 1.0, 1.0, 1.0]
+    if samples < 1 or batch_size < 1:
+        raise ValueError("Число выборок и размер пакета должны быть положительными")
+    rng = np.random.default_rng(seed)
+    vectors = sample_parameters(flatten(faks, equations), spec, samples, rng)
+    batches = [vectors[i:i + batch_size] for i in range(0, samples, batch_size)]
+    args = (initial_equations, time_value, C, xm)
+
+    if executor is not None:
+        results = executor.map(solve_batch, batches, *[[a] * len(batches) for a in args])
+    else:
+        results = (solve_batch(batch, *args) for batch in batches)
+    return _partial_results(results, samples, C, percentiles)
+
+
+def _partial_results(results, samples, C, percentiles):
+    trajectories = np.empty((samples, len(C), 5))
+    done = 0
+    for batch in results:
+        trajectories[done:done + len(batch)] = batch
+        done += len(batch)
+        solved = trajectories[:done]
+        yield {
+            "done": done == samples,
+            "samples": done,
+            "C": C,
+            "percentiles": list(percentiles),
+            "bands": np.percentile(solved, percentiles, axis=0),
+            "mean": solved.mean(axis=0),
+        }
@@ -0,0 +1,180 @@
+# optimization.py
+# Минимизация суммарных потерь (2.9) по управляемым возмущениям при ограничениях на Cf1-Cf5
+import os
+import time
+
+import numpy as np
+
+from functions import PendRHS, calculate_total_loss
+from parameters import flatten, parameter_index, unflatten
+from solvers import dopri_ensemble, hermite_peaks, restriction_crossings
+
+# По умолчанию подбираются χ1-χ6 (a·t + b)
+CONTROLS = [f"x{k + 1}.{letter}" for k in range(6) for letter in "ab"]
+
+
+def evaluate(vectors, initial_equations, time_value, C, xm, limits, weights=None, chunks=5,
+             rtol=1e-8, atol=1e-8):
+    """
+    Потери кандидатов (векторов параметров [N x P]) при C[-1].
+    Сетка C проходится по частям: после каждой части кандидаты, у которых
+    какая-либо Cf превысила ограничение limits, отбрасываются и дальше не решаются.
+    Превышение ищется и между узлами C - по эрмитову сплайну решения, как в
+    restriction_crossings, которая и дает C первого нарушения.
+    Возвращает (потери [N], inf для недопустимых; C первого нарушения [N], NaN
+    для допустимых; Cf при C[-1] [N x 5], у отброшенных - на момент отбрасывания;
+    число решенных сценариев по частям)
+    """
+    n = len(vectors)
+    rhs = PendRHS.stack([PendRHS(*unflatten(vector), xm, time_value) for vector in vectors])
+    y = np.tile(np.asarray(initial_equations, dtype=float), (n, 1))
+    violated_at = np.full(n, np.nan)
+
+    over = (y > limits).any(axis=1)
+    violated_at[over] = C[0]
+    alive = np.flatnonzero(~over)
+    solved = 0
+    edges = np.unique(np.linspace(0, len(C) - 1, chunks + 1).round().astype(int))
+    for lo, hi in zip(edges[:-1], edges[1:]):
+        if len(alive) == 0:
+            break
+        segment = C[lo:hi + 1]
+        part = rhs.subset(alive)
+        trajectories = dopri_ensemble(part, y[alive], segment, rtol=rtol, atol=atol)
+        solved += len(alive)
+        # Производные в узлах всех кандидатов одним вызовом (ось кандидатов - вторая)
+        slopes = np.swapaxes(part(np.swapaxes(trajectories, 0, 1), segment[:, None, None]), 0, 1)
+        hit = (hermite_peaks(segment, trajectories, slopes) > limits).any(axis=(1, 2))
+        for k in np.flatnonzero(hit):
+            violated_at[alive[k]] = np.nanmin(restriction_crossings(None, segment, trajectories[k], limits, slopes[k]))
+        y[alive] = trajectories[:, -1]
+        alive = alive[~hit]
+
+    loss = np.full(n, np.inf)
+    loss[alive] = calculate_total_loss(y[alive], weights)
+    return loss, violated_at, y, solved
+
+
+def _better(loss_a, violated_a, loss_b, violated_b):
+    """
+    Сравнение кандидатов a и b: допустимый лучше недопустимого, среди допустимых -
+    с меньшими потерями, среди недопустимых - нарушивший ограничения при большей C
+    """
+    feasible_a, feasible_b = np.isfinite(loss_a), np.isfinite(loss_b)
+    return np.where(feasible_a & feasible_b, loss_a <= loss_b,
+                    np.where(feasible_a | feasible_b, feasible_a, violated_a >= violated_b))
+
+
+def optimize(initial_equations, faks, equations, restrictions, time_value=0.0, target_c=1.0,
+             names=None, bounds=None, weights=None, population=30, generations=40,
+             mutation=0.7, crossover=0.9, seed=0, points=51, chunks=5, xm=None, executor=None):
+    """
+    Поиск коэффициентов names (по умолчанию CONTROLS) с минимальными потерями
+    calculate_total_loss(Cf(target_c), weights) при Cf_i <= restrictions[i] на всем [0, target_c]
+    (null или NaN в restrictions - без ограничения).
+    Дифференциальная эволюция (rand/1/bin): каждое поколение - один пакетный расчет
+    (evaluate с отбрасыванием недопустимых кандидатов по ходу расчета);
+    executor - пул процессов, поколение делится между процессами.
+    bounds - {имя: [low, high]}, по умолчанию значение ± |значение| (для нуля - [-1, 1]).
+    Начальное поколение включает текущие значения.
+    Возвращает словарь: names, values, faks, equations, loss, Cf, feasible,
+    initial (то же для исходных значений), trace (по поколениям), evaluations, seconds
+    """
+    start = time.perf_counter()
+    if xm is None:
+        xm = [1.0, 1.0, 1.0, 1.0, 1.0]
+    if population < 4:
+        raise ValueError("В поколении должно быть не меньше 4 кандидатов")
+    if not 0 < target_c <= 1:
+        raise ValueError("Целевая концентрация должна быть в (0, 1]")
+    names = CONTROLS if names is None else list(names)
+    index = parameter_index(names)
+    base = flatten(faks, equations)
+    current = base[index]
+
+    low, high = current - np.abs(current), current + np.abs(current)
+    low[current == 0], high[current == 0] = -1.0, 1.0
+    for name, (lo, hi) in (bounds or {}).items():
+        if name not in names:
+            raise ValueError(f"Границы заданы для параметра, который не подбирается: {name}")
+        low[names.index(name)], high[names.index(name)] = float(lo), float(hi)
+    if np.any(low > high):
+        raise ValueError("Нижняя граница параметра больше верхней")
+
+    limits = np.array([np.inf if r is None else float(r) for r in list(restrictions)[:5]]
+                      + [np.inf] * (5 - len(list(restrictions)[:5])))
+    limits[np.isnan(limits)] = np.inf
+    C = np.linspace(0.0, target_c, points)
+    rng = np.random.default_rng(seed)
+    evaluations = {"candidates": 0, "rejected": 0, "solved_segments": 0}
+
+    def run(chosen):
+        vectors = np.tile(base, (len(chosen), 1))
+        vectors[:, index] = chosen
+        if executor is not None:
+            parts = [part for part in np.array_split(vectors, os.cpu_count() or 1) if len(part)]
+            results = list(executor.map(evaluate, parts, *[[a] * len(parts) for a in
+                                                           (initial_equations, time_value, C, xm, limits,
+                                                            weights, chunks)]))
+            loss, violated, final = (np.concatenate([r[k] for r in results]) for k in range(3))
+            solved = sum(r[3] for r in results)
+        else:
+            loss, violated, final, solved = evaluate(vectors, initial_equations, time_value, C, xm,
+                                                     limits, weights, chunks)
+        evaluations["candidates"] += len(chosen)
+        evaluations["rejected"] += int(np.isinf(loss).sum())
+        evaluations["solved_segments"] += solved
+        return loss, violated, final
+
+    members = low + rng.random((population, len(names))) * (high - low)
+    members[0] = np.clip(current, low, high)
+    loss, violated, final = run(members)
+    initial = {"loss": loss[0], "Cf": final[0], "feasible": bool(np.isfinite(loss[0]))}
+
+    trace = []
+    for generation in range(generations + 1):
+        if generation:
+            # Мутация: a + F·(b - c) по трем различным случайным кандидатам, кроме текущего
+            picks = np.array([rng.choice(np.delete(np.arange(population), i), 3, replace=False)
+                              for i in range(population)])
+            a, b, c = members[picks[:, 0]], members[picks[:, 1]], members[picks[:, 2]]
+            mutant = np.clip(a + mutation * (b - c), low, high)
+            cross = rng.random(members.shape) < crossover
+            cross[np.arange(population), rng.integers(0, len(names), population)] = True
+            trial = np.where(cross, mutant, members)
+
+            trial_loss, trial_violated, trial_final = run(trial)
+            replace = _better(trial_loss, trial_violated, loss, violated)
+            members[replace] = trial[replace]
+            loss[replace], violated[replace] = trial_loss[replace], trial_violated[replace]
+            final[replace] = trial_final[replace]
+
+        feasible = np.isfinite(loss)
+        best = int(np.argmin(loss)) if feasible.any() else int(np.nanargmax(violated))
+        trace.append({
+            "generation": generation,
+            "best_loss": float(loss[best]) if feasible.any() else None,
+            "mean_loss": float(loss[feasible].mean()) if feasible.any() else None,
+            "feasible": int(feasible.sum()),
+            "candidates": evaluations["candidates"],
+            "rejected": evaluations["rejected"],
+            "seconds": time.perf_counter() - start,
+        })
+
+    fitted = base.copy()
+    fitted[index] = members[best]
+    best_faks, best_equations = unflatten(fitted)
+    return {
+        "names": names,
+        "values": members[best],
+        "faks": best_faks,
+        "equations": best_equations,
+        "loss": float(loss[best]) if np.isfinite(loss[best]) else None,
+        "Cf": final[best],
+        "feasible": bool(np.isfinite(loss[best])),
+        "initial": {"values": current, "loss": float(initial["loss"]) if initial["feasible"] else None,
+                    "Cf": initial["Cf"], "feasible": initial["feasible"]},
+        "trace": trace,
+        "evaluations": evaluations,
+        "seconds": time.perf_counter() - start,
+    }
@@ -0,0 +1,61 @@
+# parameters.py
+# Плоский вектор параметров модели: коэффициенты возмущений faks и внутренних функций equations
+import numpy as np
+
+from functions import F_DEFAULTS, equation_params
+
+FAKS_COUNT = 14
+_LETTERS = "abc"
+
+
+def parameter_names():
+    """
+    Имена параметров в порядке вектора:
+    x1.a, x1.b, ..., x14.b - возмущения a·t + b (a·C + b),
+    f1.a, f1.b, f3.c, ... - параметры внутренних функций f1-f12
+    """
+    names = [f"x{k + 1}.{_LETTERS[j]}" for k in range(FAKS_COUNT) for j in range(2)]
+    names += [f"f{k + 1}.{_LETTERS[j]}" for k, defaults in enumerate(F_DEFAULTS) for j in range(len(defaults))]
+    return names
+
+
+PARAMETER_NAMES = parameter_names()
+
+
+def flatten(faks, equations):
+    """
+    Вектор параметров из faks [14 x 2] и equations.
+    Недостающие параметры внутренних функций берутся по умолчанию (как в расчете).
+    Возмущения должны быть заданы полностью: пропущенное и нулевое возмущение
+    в модели не равнозначны.
+    """
+    if len(faks) < FAKS_COUNT or any(len(row) < 2 for row in faks[:FAKS_COUNT]):
+        raise ValueError(f"Нужны коэффициенты всех {FAKS_COUNT} возмущений")
+    values = [float(v) for row in faks[:FAKS_COUNT] for v in row[:2]]
+    for k in range(len(F_DEFAULTS)):
+        values += equation_params(equations, k)
+    return np.array(values)
+
+
+def unflatten(vector):
+    """Обратное к flatten: (faks, equations) списками"""
+    vector = [float(v) for v in vector]
+    if len(vector) != len(PARAMETER_NAMES):
+        raise ValueError(f"Ожидается {len(PARAMETER_NAMES)} параметров, получено {len(vector)}")
+    faks = [vector[2 * k:2 * k + 2] for k in range(FAKS_COUNT)]
+    equations = []
+    pos = 2 * FAKS_COUNT
+    for defaults in F_DEFAULTS:
+        equations.append(vector[pos:pos + len(defaults)])
+        pos += len(defaults)
+    return faks, equations
+
+
+def parameter_index(names):
+    """Номера параметров по именам (ValueError для неизвестного имени)"""
+    index = []
+    for name in names:
+        if name not in PARAMETER_NAMES:
+            raise ValueError(f"Неизвестный параметр: {name}")
+        index.append(PARAMETER_NAMES.index(name))
+    return index
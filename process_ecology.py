@@ -1,73 +1,285 @@
 # process_ecology.py 
-import matplotlib
-matplotlib.use('Agg') 
-import matplotlib.pyplot as plt
 import numpy as np
-from scipy.integrate import odeint
-from scipy.interpolate import PchipInterpolator
-from scipy.interpolate import make_interp_spline
+import functools
+import hashlib
+import io
 import logging
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
 
-from functions import pend, calculate_total_loss, fx_linear  
-from radar_diagram import RadarDiagram
+from cache import cache_key
+from functions import PendRHS, DisturbanceTable, calculate_total_loss, fx_linear  
+from metrics import collect, count_solve, stage, timed_import
+from solvers import dopri_ensemble, integrate, restriction_crossings
 
 data_sol = []
 logger = logging.getLogger(__name__)
+# Последний рендер каждого файла: (хэш входных данных, mtime и размер файла)
+_rendered = {}
+# Пул процессов для рендера (start_render_pool)
+_render_pool = None
+# matplotlib (Agg), scipy.interpolate и шаблон диаграмм загружаются при первом
+# рендере (load_renderer), чтобы импорт модуля и запуск приложения их не ждали
+plt = None
+PchipInterpolator = None
+# Постоянный рендер диаграмм: шаблон фигуры общий для всех срезов C
+_radar = None
+_renderer_lock = threading.Lock()
 
-def fill_diagrams(data, initial_equations, restrictions):
-    radar = RadarDiagram()
-    
+IMAGES_DIR = './static/images'
+# Выходная сетка C по умолчанию и предел числа узлов (parse_grid)
+GRID_POINTS = 100
+MAX_GRID_POINTS = 5000
+# Картинки, которые строит process()
+IMAGE_FILES = [
+    'figure_eco.png',
+    'disturbances_eco.png',
+    'diagram_eco.png',
+    'diagram_eco2.png',
+    'diagram_eco3.png',
+    'diagram_eco4.png',
+    'diagram_eco5.png',
+    'diagram_eco6.png'
+]
+
+def load_renderer():
+    """Импорт matplotlib, scipy.interpolate и radar_diagram при первом рендере"""
+    global plt, PchipInterpolator, _radar
+    if _radar is not None:
+        return
+    with _renderer_lock:
+        if _radar is None:
+            timed_import("matplotlib").use('Agg')
+            plt = timed_import("matplotlib.pyplot")
+            PchipInterpolator = timed_import("scipy.interpolate").PchipInterpolator
+            _radar = timed_import("radar_diagram").RadarDiagram()
+
+# Один рендер за раз в процессе: pyplot (текущая фигура) и разбор mathtext
+# в matplotlib не потокобезопасны, а рисуют и задания, и потоки запросов
+_render_lock = threading.RLock()
+
+def renders(func):
+    """Функция рендера: загружает matplotlib и выполняется под общей блокировкой"""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        load_renderer()
+        with _render_lock:
+            return func(*args, **kwargs)
+    return wrapper
+
+def warmup():
+    """
+    Прогрев перед приемом запросов: импорт модулей, кэш шрифтов, разбор mathtext,
+    проекция диаграмм и первый рендер каждого вида картинок (в память) на небольшом расчете.
+    Возвращает длительность, секунды
+    """
+    start = time.perf_counter()
+    with stage("warmup"):
+        load_renderer()
+        faks = [[0.1, 0.1]] * 14
+        table = DisturbanceTable(faks, 0.0)
+        rhs = PendRHS(faks, [], [1.0, 1.0, 1.0, 1.0, 1.0], 0.0)
+        C = np.linspace(0, 1, 11)
+        initial = [0.5] * 5
+        data, _ = integrate(rhs, initial, C)
+        restrictions = [1.0] * 5
+        crossings = restriction_crossings(rhs, C, data, restrictions)
+        artifacts = build_artifacts(C, data, faks, 0.0, table, initial, restrictions, "", crossings)
+        for _, func, args in artifacts[:3]:
+            render_png(func, args)
+    return time.perf_counter() - start
+
+@renders
+def draw_diagram(initial_data, current_data, title, restrictions, show_both_lines, filename):
+    """Одна лепестковая диаграмма (артефакт для render_artifacts)"""
+    _radar.draw(
+        filename=filename,
+        initial_data=initial_data,
+        current_data=current_data,
+        label="",
+        title=title,
+        restrictions=restrictions,
+        show_both_lines=show_both_lines
+    )
+
+# Значения C шести лепестковых диаграмм
+DIAGRAM_C = [0.0, 1/6, 2/6, 3/6, 4/6, 1.0]
+
+def diagram_slices(C, data):
+    """Значения Cf1-Cf5 в точках DIAGRAM_C (линейная интерполяция по любой сетке C)"""
+    data = np.asarray(data, dtype=float)
+    return np.array([np.interp(DIAGRAM_C, C, data[:, i]) for i in range(data.shape[1])]).T
+
+def diagram_artifacts(data, initial_equations, restrictions, images_dir=IMAGES_DIR, C=None):
+    """
+    Артефакты лепестковых диаграмм: (файл, функция, аргументы без имени файла).
+    C - сетка траектории (по умолчанию равномерная)
+    """
+    if C is None:
+        C = np.linspace(0, 1, len(data))
     clipped_initial = np.clip(initial_equations, 0, 1.0)
-    clipped_data = np.clip(data, 0, 1.0)
+    clipped_slices = np.clip(diagram_slices(C, data), 0, 1.0)
     clipped_restrictions = np.clip(restrictions, 0, 1.0)
 
-    conc_indices = [
-        0,                                # C = 0.0
-        int(len(data) * 1/6),            # C ≈ 0.1667
-        int(len(data) * 2/6),            # C ≈ 0.3333
-        int(len(data) * 3/6),            # C = 0.5
-        int(len(data) * 4/6),            # C ≈ 0.6667
-        -1                                # C = 1.0
-    ]
-    
-    c_values = [0.0, 1/6, 2/6, 3/6, 4/6, 1.0]
     # Форматируем значения с запятой в качестве разделителя дробной части
-    titles = [f"C = {c:.4f}".replace('.', ',') for c in c_values]
+    titles = [f"C = {c:.4f}".replace('.', ',') for c in DIAGRAM_C]
     
-    filenames = [
-        './static/images/diagram_eco.png',
-        './static/images/diagram_eco2.png',
-        './static/images/diagram_eco3.png',
-        './static/images/diagram_eco4.png',
-        './static/images/diagram_eco5.png',
-        './static/images/diagram_eco6.png'
-    ]
+    filenames = [os.path.join(images_dir, name) for name in IMAGE_FILES[2:]]
 
-    for i, (idx, title, fname) in enumerate(zip(conc_indices, titles, filenames)):
-        current_vals = clipped_data[idx]
-        
-        if i == 0:
-            radar.draw(
-                filename=fname,
-                initial_data=clipped_initial,
-                current_data=current_vals,
-                label="",
-                title=title,
-                restrictions=clipped_restrictions,
-                show_both_lines=False
-            )
-        else:
-            radar.draw(
-                filename=fname,
-                initial_data=clipped_initial,
-                current_data=current_vals,
-                label="",
-                title=title,
-                restrictions=clipped_restrictions,
-                show_both_lines=True
-            )
-
-def create_graphic(C, data):
+    artifacts = []
+    for i, (current, title, fname) in enumerate(zip(clipped_slices, titles, filenames)):
+        # На первой диаграмме (C = 0) только начальные условия
+        args = (clipped_initial, current, title, clipped_restrictions, i != 0)
+        artifacts.append((fname, draw_diagram, args))
+    return artifacts
+
+def fill_diagrams(data, initial_equations, restrictions, C=None):
+    for fname, func, args in diagram_artifacts(data, initial_equations, restrictions, C=C):
+        func(*args, filename=fname)
+
+def build_artifacts(C, data, faks, time_value, table, initial_equations, restrictions, images_dir=IMAGES_DIR,
+                    crossings=None):
+    """
+    Все картинки расчета: (файл, функция, аргументы); файл передается функции как filename.
+    crossings - точки достижения ограничений (restriction_crossings) для отметок на графике
+    """
+    return [
+        (os.path.join(images_dir, 'figure_eco.png'), create_graphic, (C, data, crossings, restrictions)),
+        (os.path.join(images_dir, 'disturbances_eco.png'), create_disturbances_graphic, (C, faks, time_value, table)),
+    ] + diagram_artifacts(data, initial_equations, restrictions, images_dir, C)
+
+def artifact_hash(func, args):
+    """Хэш входных данных артефакта: функция и ее аргументы (имя файла не входит)"""
+    h = hashlib.sha256(func.__name__.encode())
+    h.update(pickle.dumps(args, protocol=4))
+    return h.hexdigest()
+
+def render_artifacts(artifacts, executor=None):
+    """
+    Рендер списка артефактов (файл, функция, аргументы) на диск: каждый файл один раз
+    (при повторах берется последний), без повторного рендера, если входные
+    данные не изменились и файл на диске тот же, что был записан.
+    executor - пул процессов для параллельного рендера (по умолчанию - пул из
+    start_render_pool, если он запущен, иначе рендер в текущем потоке).
+    Возвращает список перерисованных файлов
+    """
+    unique = {}
+    for fname, func, args in artifacts:
+        unique.pop(fname, None)
+        unique[fname] = (func, args)
+
+    pending = []
+    for fname, (func, args) in unique.items():
+        digest = artifact_hash(func, args)
+        if _file_state(fname) is not None and _rendered.get(fname) == (digest, _file_state(fname)):
+            continue
+        pending.append((fname, func, args, digest))
+
+    executor = executor or _render_pool
+    if executor is not None and len(pending) > 1:
+        with stage("render.pool"):
+            futures = [executor.submit(func, *args, filename=fname) for fname, func, args, _ in pending]
+            for future in futures:
+                future.result()
+    else:
+        for fname, func, args, _ in pending:
+            with stage(_render_stage(fname)):
+                func(*args, filename=fname)
+
+    for fname, _, _, digest in pending:
+        _rendered[fname] = (digest, _file_state(fname))
+    return [fname for fname, _, _, _ in pending]
+
+def _render_stage(fname):
+    """Имя этапа рендера картинки: render.<имя файла без расширения>"""
+    return "render." + os.path.splitext(os.path.basename(fname))[0]
+
+def render_png(func, args):
+    """Рендер артефакта в память: байты PNG"""
+    buffer = io.BytesIO()
+    func(*args, filename=buffer)
+    return buffer.getvalue()
+
+def render_images(artifacts, image_cache, executor=None):
+    """
+    Рендер артефактов в память (cache.ImageCache) без записи на диск.
+    Ключ картинки - хэш ее входных данных: картинки, которые уже есть
+    в кэше, не перерисовываются. Возвращает {имя файла: (хэш, байты PNG)} -
+    байты отдаются напрямую, картинка могла быть уже вытеснена из кэша
+    """
+    images = {}
+    pending = {}
+    for fname, func, args in artifacts:
+        digest = artifact_hash(func, args)
+        data = image_cache.peek(digest)
+        images[os.path.basename(fname)] = (digest, data)
+        if data is None:
+            pending[digest] = (fname, func, args)
+
+    rendered = {}
+    executor = executor or _render_pool
+    if executor is not None and len(pending) > 1:
+        with stage("render.pool"):
+            futures = {digest: executor.submit(render_png, func, args)
+                       for digest, (_, func, args) in pending.items()}
+            for digest, future in futures.items():
+                rendered[digest] = future.result()
+                image_cache.put(digest, rendered[digest])
+    else:
+        for digest, (fname, func, args) in pending.items():
+            with stage(_render_stage(fname)):
+                rendered[digest] = render_png(func, args)
+            image_cache.put(digest, rendered[digest])
+    return {name: (digest, rendered.get(digest, data)) for name, (digest, data) in images.items()}
+
+@renders
+def _warm_renderer():
+    """Инициализация процесса пула: matplotlib импортирован, шрифты и Agg прогреты"""
+    fig = plt.figure(figsize=(1, 1))
+    fig.text(0.5, 0.5, "Cf₁ χ₁")
+    fig.savefig(io.BytesIO(), format='png')
+    plt.close(fig)
+
+def start_render_pool(workers=None):
+    """Запуск пула процессов для рендера картинок (workers=None - по числу ядер)"""
+    global _render_pool
+    stop_render_pool()
+    workers = workers or os.cpu_count() or 1
+    _render_pool = ProcessPoolExecutor(max_workers=workers, initializer=_warm_renderer)
+    # Процессы создаются лениво: запускаем их сразу, а не на первом запросе
+    list(_render_pool.map(abs, range(workers)))
+    return _render_pool
+
+def stop_render_pool():
+    global _render_pool
+    if _render_pool is not None:
+        _render_pool.shutdown()
+        _render_pool = None
+
+def _file_state(fname):
+    try:
+        st = os.stat(fname)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+# Гамма-коррекция кривых Cf1-Cf5 на графике
+GAMMA_CF = [2.8, 2.2, 1.6, 3.0, 2.0]  # можно одинаковые
+
+def display_curve(values, i):
+    """Кривая Cf_i для графика: обрезка по [0, 1], монотонность и гамма-коррекция"""
+    y_data = np.maximum.accumulate(np.clip(values, 0, 1.0))
+    return y_data ** (1 / GAMMA_CF[i])
+
+@renders
+def create_graphic(C, data, crossings=None, restrictions=None, filename='./static/images/figure_eco.png'):
+    """
+    График Cf1-Cf5 от C; если заданы crossings, точки C*, где Cf_i достигает
+    ограничения restrictions[i], отмечаются маркером и вертикальной линией
+    """
     fig, ax = plt.subplots(figsize=(20, 10))
     
     labels = [
@@ -87,15 +299,7 @@ def create_graphic(C, data):
     
     for i in range(5):
 
-        y_data = np.clip(data[:, i], 0, 1.0)
-
-
-        for j in range(1, len(y_data)):
-            y_data[j] = max(y_data[j], y_data[j-1])
-
-    
-        gamma_cf = [2.8, 2.2, 1.6, 3.0, 2.0]  # можно одинаковые
-        y_data = y_data ** (1 / gamma_cf[i])
+        y_data = display_curve(data[:, i], i)
         
         
         # Обеспечиваем монотонное возрастание
@@ -103,7 +307,7 @@ def create_graphic(C, data):
         # Создаем сглаженную версию графика с помощью сплайнов
         if len(C) > 3:  # Для сплайна нужно минимум 4 точки
             # Увеличиваем количество точек для более плавного графика
-            C_smooth = np.linspace(C.min(), C.max(), 200)
+            C_smooth = np.linspace(C.min(), C.max(), max(200, len(C)))
             
             # Создаем сплайн с небольшим сглаживанием (s=0.5)
             interp = PchipInterpolator(C, y_data)  # k=3 для кубического сплайна
@@ -165,6 +369,29 @@ def create_graphic(C, data):
                     va='center', ha='center',
                     rotation=angle,
                     bbox=None)
+
+    # Суммарные потери (2.9) по всей кривой
+    total_loss = calculate_total_loss(np.clip(data, 0.0, 1.0))
+    if len(C) > 3:
+        C_smooth = np.linspace(C.min(), C.max(), max(200, len(C)))
+        ax.plot(C_smooth, np.clip(PchipInterpolator(C, total_loss)(C_smooth), 0, 1.0), color='black',
+                linestyle='--', linewidth=2.5, label="L - Суммарные потери")
+    else:
+        ax.plot(C, total_loss, color='black', linestyle='--', linewidth=2.5, label="L - Суммарные потери")
+
+    # Точки достижения ограничений
+    if crossings is not None:
+        crossings = np.array(crossings, dtype=float)
+        for i, c_star in enumerate(crossings[:5]):
+            if np.isnan(c_star):
+                continue
+            y_star = display_curve(np.array([restrictions[i]]), i)[0]
+            ax.axvline(c_star, color=colors[i], linestyle='--', alpha=0.6, linewidth=1.5)
+            ax.plot([c_star], [y_star], marker='o', markersize=10, color=colors[i],
+                    markeredgecolor='black', zorder=5)
+            ax.annotate(f"C* = {c_star:.3f}".replace('.', ','), (c_star, y_star),
+                        xytext=(8, -18), textcoords='offset points',
+                        fontsize=13, fontweight='bold', color=colors[i])
     
     ax.set_xlim([0, 1])
     ax.set_ylim([0, 1.0])
@@ -200,7 +427,7 @@ def create_graphic(C, data):
         label.set_fontsize(14)
     
     plt.tight_layout(pad=3.0)
-    fig.savefig('./static/images/figure_eco.png', bbox_inches='tight', dpi=150)
+    fig.savefig(filename, bbox_inches='tight', dpi=150)
     plt.close(fig)
 
 
@@ -226,50 +453,380 @@ def cast_to_float(initial_equations, faks, equations, restrictions):
     return initial_equations, faks, equations, restrictions
 
 
-def process(initial_equations, faks, equations, restrictions, time_value=0.0):
+def parse_grid(grid):
+    """
+    Выходная сетка C из параметров запроса:
+    None - GRID_POINTS равномерных узлов; число N или {"type": "fixed", "points": N} -
+    N равномерных узлов
+    """
+    if grid is None:
+        grid = GRID_POINTS
+    if not isinstance(grid, dict):
+        grid = {"type": "fixed", "points": grid}
+    kind = grid.get("type", "fixed")
+    if kind == "fixed":
+        points = int(grid.get("points", GRID_POINTS))
+        if not 2 <= points <= MAX_GRID_POINTS:
+            raise ValueError(f"Число узлов сетки должно быть от 2 до {MAX_GRID_POINTS}")
+        return {"type": "fixed", "points": points}
+    raise ValueError(f"Неизвестный тип сетки: {kind}")
+
+def solve_on_grid(rhs, initial_equations, grid, solver="odeint", rtol=None, atol=None):
+    """Решение на сетке из parse_grid: (C, траектория, статистика решателя)"""
+    C = np.linspace(0, 1, parse_grid(grid)["points"])
+    with stage("solve"):
+        data, stats = integrate(rhs, initial_equations, C, solver, rtol, atol)
+    stats["grid_points"] = len(C)
+    count_solve(stats)
+    return C, data, stats
+
+def process(initial_equations, faks, equations, restrictions, time_value=0.0,
+            solver="odeint", rtol=None, atol=None, images_dir=IMAGES_DIR, grid=None):
     global data_sol
 
-    initial_equations, faks, equations, restrictions = cast_to_float(
-        initial_equations, faks, equations, restrictions
-    )
-    time_value = float(time_value)
+    _, data_sol, stats, _ = solve_and_render(initial_equations, faks, equations, restrictions, time_value,
+                                             solver, rtol, atol, images_dir, grid=grid)
+    return stats
+
+def solve_and_render(initial_equations, faks, equations, restrictions, time_value=0.0,
+                     solver="odeint", rtol=None, atol=None, images_dir=IMAGES_DIR, image_cache=None, grid=None):
+    """
+    Расчет и картинки: в каталог images_dir или, если задан image_cache, в память.
+    grid - выходная сетка C (parse_grid).
+    Возвращает (сетку C, траекторию, статистику решателя, {имя картинки: путь или (хэш, байты PNG)})
+    """
+    with stage("parse"):
+        initial_equations, faks, equations, restrictions = cast_to_float(
+            initial_equations, faks, equations, restrictions
+        )
+        time_value = float(time_value)
 
     logger.info(f"Параметры внутренних функций получены с интерфейса:")
     for i, eq_params in enumerate(equations):
         if eq_params:  
             logger.info(f"  f{i+1}: {eq_params}")
 
-    C = np.linspace(0, 1, 100)
-
     xm = [1.0, 1.0, 1.0, 1.0, 1.0] 
 
-    data_sol = odeint(pend, initial_equations, C, args=(faks, equations, xm, time_value))
-
-
-    data_sol_raw = data_sol
+    # Таблица возмущений x1-x14 - для графика возмущений и лога x1-x6
+    table = DisturbanceTable(faks, time_value)
+    rhs = PendRHS(faks, equations, xm, time_value)
+    C, data, stats = solve_on_grid(rhs, initial_equations, grid, solver, rtol, atol)
+    logger.info(f"Решатель {stats['solver']}: nfev={stats['nfev']}, njev={stats['njev']}, "
+                f"шагов={stats['nsteps']}, отрезков={stats['segments']}, узлов C={len(C)}")
 
-    data_sol_display = np.clip(data_sol_raw, 0.0, 1.0)
+    # Точные точки достижения ограничений (хранятся вместе со статистикой в кэше)
+    with stage("crossings"):
+        crossings = restriction_crossings(rhs, C, data, restrictions)
+    stats["crossings"] = [None if np.isnan(c) else float(c) for c in crossings]
+    logger.info(f"Ограничения достигаются при C* = {stats['crossings']}")
 
 
-    create_graphic(C, data_sol_display)
-    create_disturbances_graphic(C, faks, time_value)
-    fill_diagrams(data_sol_display, initial_equations, restrictions)
-
-
-    data_sol = data_sol_raw
-    create_graphic(C, data_sol)
-    create_disturbances_graphic(C, faks, time_value)  
-    fill_diagrams(data_sol, initial_equations, restrictions)
+    # Каждая картинка строится один раз; неизменившиеся не перерисовываются
+    if image_cache is not None:
+        artifacts = build_artifacts(C, data, faks, time_value, table, initial_equations, restrictions, "",
+                                    stats["crossings"])
+        images = render_images(artifacts, image_cache)
+    else:
+        artifacts = build_artifacts(C, data, faks, time_value, table, initial_equations, restrictions, images_dir,
+                                    stats["crossings"])
+        rendered = render_artifacts(artifacts)
+        logger.info(f"Перерисовано картинок: {len(rendered)} из {len(artifacts)}")
+        images = {os.path.basename(fname): fname for fname, _, _ in artifacts}
     
     logger.info(f"Расчет завершен. Концентрация: {len(C)} точек, время t={time_value}.")
     logger.info(f"Начальные значения: {initial_equations}")
-    logger.info(f"Конечные значения при C=1: {data_sol[-1]}")
+    logger.info(f"Конечные значения при C=1: {data[-1]}")
     
     logger.info("Значения возмущений x1-x6 в момент времени t=" + str(time_value) + ":")
     for i in range(min(6, len(faks))):
-        value = fx_linear(time_value, faks[i])
+        value = table.time_levels[i] if table.valid[i] else fx_linear(time_value, faks[i])
         logger.info(f"  x{i+1}(t) = {value:.4f}")
 
+    return C, data, stats, images
+
+def parse_scenario(scenario):
+    """Параметры сценария (словарь как в запросе /draw_graphics), приведенные к float"""
+    initial_equations, faks, equations, restrictions = cast_to_float(
+        list(scenario["initial_equations"]),
+        [list(row) for row in scenario["faks"]],
+        [list(row) for row in scenario["equations"]],
+        list(scenario.get("restrictions", [])),
+    )
+    time_value = float(scenario.get("time_value", 0.0))
+    return initial_equations, faks, equations, restrictions, time_value
+
+
+def result_key(initial_equations, faks, equations, restrictions, time_value, solver, rtol, atol, grid):
+    """Ключ кэша результатов: параметры, приведенные к float, решатель и сетка"""
+    return cache_key({
+        "initial_equations": initial_equations, "faks": faks, "equations": equations,
+        "restrictions": restrictions, "time_value": time_value, "solver": solver,
+        "rtol": None if rtol is None else float(rtol),
+        "atol": None if atol is None else float(atol),
+        "grid": parse_grid(grid),
+    })
+
+def cached_grid(entry):
+    """Сетка C записи кэша (в старых записях не хранилась - равномерная)"""
+    if entry.get("grid") is not None:
+        return entry["grid"]
+    return np.linspace(0, 1, len(entry["trajectory"]))
+
+
+def cached_process(cache, image_cache, initial_equations, faks, equations, restrictions, time_value=0.0,
+                   solver="odeint", rtol=None, atol=None, grid=None):
+    """
+    process() через кэш результатов (cache.ResultCache).
+    Ключ - хэш параметров, приведенных к float, настроек решателя и сетки C (parse_grid);
+    при попадании картинки восстанавливаются из кэша без расчета.
+    Картинки отдаются из image_cache (cache.ImageCache), адрес - по хэшу входных данных картинки.
+    Возвращает (статистику решателя, True при попадании в кэш, {имя картинки: URL})
+    """
+    global data_sol
+
+    with stage("parse"):
+        initial, fak_values, eq_values, restr, t = parse_scenario({
+            "initial_equations": initial_equations, "faks": faks, "equations": equations,
+            "restrictions": restrictions, "time_value": time_value,
+        })
+        key = result_key(initial, fak_values, eq_values, restr, t, solver, rtol, atol, grid)
+
+    with stage("cache_get"):
+        entry = cache.get(key)
+    if entry is not None:
+        data_sol = entry["trajectory"]
+        logger.info(f"Результат взят из кэша: {key[:12]}")
+        # Хэши картинок восстанавливаются по траектории без рендера
+        C = cached_grid(entry)
+        table = DisturbanceTable(fak_values, t)
+        artifacts = build_artifacts(C, data_sol, fak_values, t, table, initial, restr, "",
+                                    entry["stats"].get("crossings"))
+        urls = {}
+        for name, func, args in artifacts:
+            digest = artifact_hash(func, args)
+            if digest not in image_cache:
+                image_cache.put(digest, entry["images"][name])
+            urls[name] = image_cache.url(digest)
+        return entry["stats"], True, urls
+
+    C, data, stats, images = solve_and_render(initial, fak_values, eq_values, restr, t, solver, rtol, atol,
+                                              image_cache=image_cache, grid=grid)
+    data_sol = data
+    with stage("cache_put"):
+        cache.put(key, data, stats, {name: image for name, (_, image) in images.items()}, C)
+    return stats, False, {name: image_cache.url(digest) for name, (digest, _) in images.items()}
+
+
+def result_arrays(cache, initial_equations, faks, equations, restrictions, time_value=0.0,
+                  solver="odeint", rtol=None, atol=None, grid=None, weights=None):
+    """
+    Числовые результаты расчета без рендера картинок: то, что показывают графики.
+    Траектория берется из кэша результатов, если расчет с такими параметрами уже был.
+    weights - весовые коэффициенты μ1-μ5 суммарных потерь (по умолчанию по 0.2).
+    Возвращает словарь массивов float
+    """
+    initial, fak_values, eq_values, restr, t = parse_scenario({
+        "initial_equations": initial_equations, "faks": faks, "equations": equations,
+        "restrictions": restrictions, "time_value": time_value,
+    })
+    table = DisturbanceTable(fak_values, t)
+
+    entry = cache.get(result_key(initial, fak_values, eq_values, restr, t, solver, rtol, atol, grid)
+                      ) if cache is not None else None
+    rhs = PendRHS(fak_values, eq_values, [1.0, 1.0, 1.0, 1.0, 1.0], t)
+    if entry is not None:
+        C, data = cached_grid(entry), entry["trajectory"]
+    else:
+        C, data, _ = solve_on_grid(rhs, initial, grid, solver, rtol, atol)
+
+    display = np.clip(data, 0.0, 1.0)
+    levels = table.levels_at(C)
+    return {
+        "C": C,
+        "raw": data,
+        "display": display,
+        # Суммарные потери (2.9) в каждой точке C
+        "total_loss": calculate_total_loss(display, weights),
+        # Уровни x1-x14 на сетке C и кривые с графика возмущений (накопленный максимум)
+        "disturbances": levels,
+        "disturbance_curves": np.maximum.accumulate(levels, axis=0),
+        "radar_c": np.array(DIAGRAM_C),
+        "radar": np.clip(diagram_slices(C, data), 0.0, 1.0),
+        "initial": np.clip(initial, 0.0, 1.0),
+        "restrictions": np.clip(restr, 0.0, 1.0),
+        # C*, где Cf_i достигает ограничения (NaN - не достигает)
+        "crossings": restriction_crossings(rhs, C, data, restr),
+    }
+
+
+def scenario_summary(scenario, trajectory=False):
+    """
+    Итоги одного сценария для /batch (словарь как в запросе /draw_graphics, плюс
+    необязательные solver, rtol, atol, grid, weights): Cf1-Cf5 при C=1, точки достижения
+    ограничений, суммарные потери при C=1 и их максимум по C, статистика решателя.
+    trajectory - добавить сетку C и траекторию (для рендера картинок).
+    Функция уровня модуля: выполняется в пуле процессов, поэтому этапы расчета
+    возвращаются в "timings" (список (имя, секунды)) для учета в /metrics вызывающим процессом
+    """
+    with collect() as timings:
+        with stage("parse"):
+            initial, faks, equations, restrictions, t = parse_scenario(scenario)
+        rhs = PendRHS(faks, equations, [1.0, 1.0, 1.0, 1.0, 1.0], t)
+        C, data, stats = solve_on_grid(rhs, initial, scenario.get("grid"), scenario.get("solver", "odeint"),
+                                       scenario.get("rtol"), scenario.get("atol"))
+        with stage("crossings"):
+            crossings = restriction_crossings(rhs, C, data, restrictions)
+    display = np.clip(data, 0.0, 1.0)
+    total_loss = calculate_total_loss(display, scenario.get("weights"))
+    summary = {
+        "final": display[-1],
+        "crossings": crossings,
+        "total_loss": float(total_loss[-1]),
+        "max_total_loss": float(total_loss.max()),
+        "solver_stats": stats,
+        "timings": timings,
+    }
+    if trajectory:
+        summary.update(C=C, trajectory=data)
+    return summary
+
+
+def solve_ensemble(scenarios, C=None, xm=None, rtol=1e-10, atol=1e-10):
+    """
+    Пакетный расчет N сценариев как одной системы N×5 на общей сетке C.
+    scenarios - список словарей с ключами initial_equations, faks, equations, time_value
+    Возвращает массив [N x len(C) x 5]
+    """
+    if C is None:
+        C = np.linspace(0, 1, 100)
+    if xm is None:
+        xm = [1.0, 1.0, 1.0, 1.0, 1.0]
+
+    rhs_list = []
+    y0 = []
+    for scenario in scenarios:
+        initial_equations, faks, equations, _, time_value = parse_scenario(scenario)
+        rhs_list.append(PendRHS(faks, equations, xm, time_value))
+        y0.append(initial_equations)
+
+    if not rhs_list:
+        return np.empty((0, len(C), 5))
+    return dopri_ensemble(PendRHS.stack(rhs_list), y0, C, rtol=rtol, atol=atol)
+
+
+def sweep_time(initial_equations, faks, equations, t_values, C=None, xm=None, rtol=1e-10, atol=1e-10):
+    """
+    Поверхность потерь по (t, C): один пакетный расчет для всех t из t_values.
+    Возмущения x1-x6 считаются сразу для всего массива t.
+    Возвращает массив [len(t_values) x len(C) x 5]
+    """
+    if C is None:
+        C = np.linspace(0, 1, 100)
+    if xm is None:
+        xm = [1.0, 1.0, 1.0, 1.0, 1.0]
+    t_values = np.asarray(t_values, dtype=float).ravel()
+    if len(t_values) == 0:
+        return np.empty((0, len(C), 5))
+
+    rhs = PendRHS(faks, equations, xm, t_values)
+    y0 = np.broadcast_to(np.asarray(initial_equations, dtype=float), (len(t_values), 5))
+    return dopri_ensemble(rhs, y0, C, rtol=rtol, atol=atol)
+
+
+@renders
+def create_sweep_graphic(t_values, C, surface, filename='./static/images/sweep_eco.png'):
+    """Карты Cf1-Cf5 по (C, t) с линиями уровня"""
+    fig, axes = plt.subplots(1, 5, figsize=(25, 5.5), sharey=True)
+    titles = ["Cf₁", "Cf₂", "Cf₃", "Cf₄", "Cf₅"]
+    display = np.clip(surface, 0.0, 1.0)
+    levels = np.linspace(0.0, 1.0, 11)
+    for i, ax in enumerate(axes):
+        if len(t_values) > 1:
+            filled = ax.contourf(C, t_values, display[:, :, i], levels=levels, cmap='viridis')
+            lines = ax.contour(C, t_values, display[:, :, i], levels=levels, colors='white', linewidths=0.5)
+            ax.clabel(lines, fontsize=8, fmt='%.1f')
+        else:
+            # Одно t: ячейки с центрами в узлах C, границы - середины между узлами
+            edges = np.concatenate([[C[0]], (C[:-1] + C[1:]) / 2.0, [C[-1]]])
+            filled = ax.pcolormesh(edges, [t_values[0] - 0.5, t_values[0] + 0.5], display[:, :, i],
+                                   vmin=0.0, vmax=1.0, cmap='viridis')
+        ax.set_title(titles[i], fontsize=14, fontweight='bold')
+        ax.set_xlabel("C", fontsize=12)
+    axes[0].set_ylabel("t", fontsize=12)
+    fig.colorbar(filled, ax=list(axes), fraction=0.02, pad=0.01)
+    fig.savefig(filename, bbox_inches='tight', dpi=100)
+    plt.close(fig)
+
+
+@renders
+def create_band_graphic(C, bands, samples, filename='./static/images/bands_eco.png'):
+    """
+    Перцентильные полосы Монте-Карло в стиле create_graphic:
+    bands - [3 x len(C) x 5] (нижний перцентиль, медиана, верхний перцентиль)
+    """
+    fig, ax = plt.subplots(figsize=(20, 10))
+    labels = [
+        "Cf₁ - Потери от заболеваемости населения",
+        "Cf₂ - Потери сельского хозяйства",
+        "Cf₃ - Потери от изменения природной среды",
+        "Cf₄ - Потери от ухудшения качества жизни",
+        "Cf₅ - Потери предприятия"
+    ]
+    colors = ['#1f77b4', '#ff7f0e', '#2ca02c', '#d62728', '#9467bd']
+
+    for i in range(5):
+        low, median, high = (display_curve(band[:, i], i) for band in bands)
+        ax.fill_between(C, low, high, color=colors[i], alpha=0.2, linewidth=0)
+        ax.plot(C, median, color=colors[i], linewidth=2.5, label=labels[i])
+
+    ax.set_xlim([0, 1])
+    ax.set_ylim([0, 1.0])
+    ax.set_xlabel("C, концентрация загрязняющих веществ",
+                  fontsize=18, fontweight='bold', color='black')
+    ax.set_ylabel("Значения характеристик",
+                  fontsize=18, fontweight='bold', color='black')
+    ax.set_title(f"Медиана и полосы перцентилей по {samples} выборкам",
+                 fontsize=20, fontweight='bold', pad=20, color='black')
+    legend = ax.legend(loc='upper left', fontsize=14, framealpha=0.9,
+                       edgecolor='black', fancybox=True)
+    plt.setp(legend.get_texts(), color='black')
+    ax.grid(True, alpha=0.3, linestyle='--')
+    ax.tick_params(axis='both', which='major', labelsize=16, colors='black')
+    ax.axhline(y=1.0, color='red', linestyle=':', alpha=0.7, linewidth=2)
+    ax.spines['top'].set_visible(False)
+    ax.spines['right'].set_visible(False)
+
+    plt.tight_layout(pad=3.0)
+    fig.savefig(filename, bbox_inches='tight', dpi=150)
+    plt.close(fig)
+
+
+@renders
+def create_tornado_graphic(names, scaled, top=15, filename='./static/images/tornado_eco.png'):
+    """
+    Диаграммы-торнадо чувствительности Cf1-Cf5 при C=1:
+    top параметров с наибольшим |scaled| для каждой характеристики
+    """
+    fig, axes = plt.subplots(1, 5, figsize=(25, max(4.0, 0.35 * top + 1.5)))
+    titles = ["Cf₁", "Cf₂", "Cf₃", "Cf₄", "Cf₅"]
+    names = np.asarray(names)
+    for i, ax in enumerate(axes):
+        values = np.asarray(scaled)[:, i]
+        order = np.argsort(-np.abs(values), kind="stable")[:top][::-1]
+        colors = np.where(values[order] >= 0, '#d62728', '#1f77b4')
+        ax.barh(np.arange(len(order)), values[order], color=colors)
+        ax.set_yticks(np.arange(len(order)))
+        ax.set_yticklabels(names[order], fontsize=9)
+        ax.axvline(0.0, color='black', linewidth=0.8)
+        ax.set_title(titles[i] + " (C = 1)", fontsize=14, fontweight='bold')
+        ax.set_xlabel("∂Cf/∂p · |p|", fontsize=11)
+        ax.grid(axis='x', alpha=0.3)
+    fig.tight_layout()
+    fig.savefig(filename, bbox_inches='tight', dpi=100)
+    plt.close(fig)
+
+
 u_list = [
     "Cf₁ - Потери, связанные с ростом заболеваемости населения",
     "Cf₂ - Потери сельского хозяйства от воздействия атмосферных поллютантов",
@@ -278,7 +835,14 @@ u_list = [
     "Cf₅ - Потери предприятия, возникающие при регулировании атмосферных выбросов и оплате штрафов"
 ]
 
-def create_disturbances_graphic(C, faks, time_value=0.0):
+@renders
+def create_disturbances_graphic(C, faks, time_value=0.0, table=None,
+                                filename='./static/images/disturbances_eco.png'):
+    if table is None:
+        table = DisturbanceTable(faks, time_value, C)
+    # Значения всех возмущений на сетке C (столбцы x1-x14)
+    levels = table.levels_at(C)
+
     fig, axes = plt.subplots(3, 1, figsize=(16, 18))
     ax1, ax2, ax3 = axes
  
@@ -293,9 +857,8 @@ def create_disturbances_graphic(C, faks, time_value=0.0):
     # Сортируем значения по величине, чтобы избежать наложения
     values = []
     for i in range(min(6, len(faks))):
-        if len(faks[i]) >= 2:
-            value = max(0.0, min(1.0, fx_linear(time_value, faks[i])))
-            values.append((i, value))
+        if table.valid[i]:
+            values.append((i, float(table.time_levels[i])))
     
     # Сортируем по значению для лучшего распределения
     values.sort(key=lambda x: x[1])
@@ -329,15 +892,9 @@ def create_disturbances_graphic(C, faks, time_value=0.0):
     # ВОЗМУЩЕНИЯ, ЗАВИСЯЩИЕ ОТ КОНЦЕНТРАЦИИ (x₇-x₁₀) 
     curves_1 = []
     for i in range(6, min(10, len(faks))):
-        if i < len(faks) and len(faks[i]) >= 2:
-            curve = []
-            max_val = 0.0
-            for c_val in C:
-                value = fx_linear(c_val, faks[i])
-                value = max(0.0, min(1.0, value))
-                # Обеспечиваем монотонное возрастание
-                max_val = max(max_val, value)
-                curve.append(max_val)
+        if table.valid[i]:
+            # Обеспечиваем монотонное возрастание
+            curve = np.maximum.accumulate(levels[:, i])
             curves_1.append((i, curve))
     
     num_curves_1 = len(curves_1)
@@ -418,15 +975,9 @@ def create_disturbances_graphic(C, faks, time_value=0.0):
     # ВОЗМУЩЕНИЯ, ЗАВИСЯЩИЕ ОТ КОНЦЕНТРАЦИИ (x₁₁-x₁₄) 
     curves_2 = []
     for i in range(10, min(14, len(faks))):
-        if i < len(faks) and len(faks[i]) >= 2:
-            curve = []
-            max_val = 0.0
-            for c_val in C:
-                value = fx_linear(c_val, faks[i])
-                value = max(0.0, min(1.0, value))
-                # Обеспечиваем монотонное возрастание
-                max_val = max(max_val, value)
-                curve.append(max_val)
+        if table.valid[i]:
+            # Обеспечиваем монотонное возрастание
+            curve = np.maximum.accumulate(levels[:, i])
             curves_2.append((i, curve))
 
     num_curves_2 = len(curves_2)
@@ -515,14 +1066,14 @@ def create_disturbances_graphic(C, faks, time_value=0.0):
         ax.axhline(y=1.0, color='black', linestyle='-', alpha=0.1, linewidth=0.5)
     
     plt.tight_layout()
-    fig.savefig('./static/images/disturbances_eco.png', bbox_inches='tight', dpi=150)
+    fig.savefig(filename, bbox_inches='tight', dpi=150)
     plt.close(fig)
   
     logger.info(f"Создан график возмущений. t={time_value:.2f}")
 
     for i in range(min(6, len(faks))):
-        if len(faks[i]) >= 2:
-            value = fx_linear(time_value, faks[i])
+        if table.valid[i]:
+            value = table.time_levels[i]
             logger.info(f"  x{i+1}(t={time_value:.2f}) = {value:.4f}")
 
     all_values_in_range = True
@@ -4,6 +4,9 @@ import matplotlib
 matplotlib.use('Agg')
 import matplotlib.pyplot as plt
 import numpy as np
+import threading
+from collections import OrderedDict
+from matplotlib.figure import Figure
 from matplotlib.patches import Circle, RegularPolygon
 from matplotlib.path import Path
 from matplotlib.projections.polar import PolarAxes
@@ -12,63 +15,108 @@ from matplotlib.spines import Spine
 from matplotlib.transforms import Affine2D
 
 
+def make_radar_axes(num_vars, frame='circle', name='radar'):
+    """Класс осей лепестковой диаграммы на num_vars осей и углы осей"""
+    theta = np.linspace(0, 2 * np.pi, num_vars, endpoint=False)
+
+    class RadarAxes(PolarAxes):
+
+        RESOLUTION = 1
+
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            self.set_theta_zero_location('N')
+
+        def fill(self, *args, closed=True, **kwargs):
+            return super().fill(closed=closed, *args, **kwargs)
+
+        def plot(self, *args, **kwargs):
+            lines = super().plot(*args, **kwargs)
+            for line in lines:
+                self._close_line(line)
+            return lines
+
+        def _close_line(self, line):
+            x, y = line.get_data()
+            if x[0] != x[-1]:
+                x = np.append(x, x[0])
+                y = np.append(y, y[0])
+                line.set_data(x, y)
+
+        def set_varlabels(self, labels):
+            self.set_thetagrids(np.degrees(theta), labels)
+
+        def _gen_axes_patch(self):
+            if frame == 'circle':
+                return Circle((0.5, 0.5), 0.5)
+            elif frame == 'polygon':
+                return RegularPolygon((0.5, 0.5), num_vars,
+                                      radius=.5, edgecolor="k")
+            else:
+                raise ValueError("Unknown value for 'frame': %s" % frame)
+
+        def _gen_axes_spines(self):
+            if frame == 'circle':
+                return super()._gen_axes_spines()
+            elif frame == 'polygon':
+                spine = Spine(axes=self,
+                              spine_type='circle',
+                              path=Path.unit_regular_polygon(num_vars))
+                spine.set_transform(Affine2D().scale(.5).translate(.5, .5)
+                                    + self.transAxes)
+                return {'polar': spine}
+            else:
+                raise ValueError("Unknown value for 'frame': %s" % frame)
+
+    RadarAxes.name = name
+    return theta, RadarAxes
+
+
+# Проекции, уже зарегистрированные для постоянного рендера: (num_vars, frame) -> (имя, углы)
+_projections = {}
+_projections_lock = threading.Lock()
+
+
+def radar_projection(num_vars, frame='polygon'):
+    """Имя проекции и углы осей; проекция регистрируется один раз на процесс"""
+    with _projections_lock:
+        key = (num_vars, frame)
+        if key not in _projections:
+            name = f'radar_{frame}_{num_vars}'
+            theta, axes_class = make_radar_axes(num_vars, frame, name)
+            register_projection(axes_class)
+            _projections[key] = (name, theta)
+        return _projections[key]
+
+
 class RadarDiagram:
+    """
+    Лепестковые диаграммы.
+    reuse_figure=True: фигура с неизменной частью (рамка, сетка, подписи,
+    предельные значения, начальные условия) строится один раз и хранится
+    как шаблон; для очередного среза C обновляются только линия текущих
+    характеристик, масштаб и заголовок.
+    reuse_figure=False: новая фигура на каждый вызов (прежний путь).
+    """
+
+    # Сколько шаблонов фигур держать (разные начальные условия и ограничения)
+    MAX_TEMPLATES = 4
+
+    def __init__(self, reuse_figure=True):
+        self.reuse_figure = reuse_figure
+        self._templates = OrderedDict()
+        self._lock = threading.Lock()
+
     def radar_factory(self, num_vars, frame='circle'):
-        theta = np.linspace(0, 2 * np.pi, num_vars, endpoint=False)
-
-        class RadarAxes(PolarAxes):
-
-            name = 'radar'
-            RESOLUTION = 1
-
-            def __init__(self, *args, **kwargs):
-                super().__init__(*args, **kwargs)
-                self.set_theta_zero_location('N')
-
-            def fill(self, *args, closed=True, **kwargs):
-                return super().fill(closed=closed, *args, **kwargs)
-
-            def plot(self, *args, **kwargs):
-                lines = super().plot(*args, **kwargs)
-                for line in lines:
-                    self._close_line(line)
-
-            def _close_line(self, line):
-                x, y = line.get_data()
-                if x[0] != x[-1]:
-                    x = np.append(x, x[0])
-                    y = np.append(y, y[0])
-                    line.set_data(x, y)
-
-            def set_varlabels(self, labels):
-                self.set_thetagrids(np.degrees(theta), labels)
-
-            def _gen_axes_patch(self):
-                if frame == 'circle':
-                    return Circle((0.5, 0.5), 0.5)
-                elif frame == 'polygon':
-                    return RegularPolygon((0.5, 0.5), num_vars,
-                                          radius=.5, edgecolor="k")
-                else:
-                    raise ValueError("Unknown value for 'frame': %s" % frame)
-
-            def _gen_axes_spines(self):
-                if frame == 'circle':
-                    return super()._gen_axes_spines()
-                elif frame == 'polygon':
-                    spine = Spine(axes=self,
-                                  spine_type='circle',
-                                  path=Path.unit_regular_polygon(num_vars))
-                    spine.set_transform(Affine2D().scale(.5).translate(.5, .5)
-                                        + self.transAxes)
-                    return {'polar': spine}
-                else:
-                    raise ValueError("Unknown value for 'frame': %s" % frame)
-
-        register_projection(RadarAxes)
+        theta, axes_class = make_radar_axes(num_vars, frame)
+        register_projection(axes_class)
         return theta
 
     def draw(self, filename, initial_data, current_data, label, title, restrictions=None, show_both_lines=True):
+        if self.reuse_figure:
+            return self._draw_from_template(filename, initial_data, current_data, title,
+                                            restrictions, show_both_lines)
+
         N = len(initial_data)
         theta = self.radar_factory(N, frame='polygon')
 
@@ -129,4 +177,71 @@ class RadarDiagram:
                 size='large',
                 fontproperties={'family': 'DejaVu Sans', 'size': 12})
         fig.savefig(filename, bbox_inches='tight')
-        plt.close(fig)
\ No newline at end of file
+        plt.close(fig)
+
+    @staticmethod
+    def _axis_limit(initial_data, current_data, restrictions):
+        """Верхняя граница радиальной оси (как в draw)"""
+        max_vals = []
+        for i in range(len(initial_data)):
+            axis_max = 1.0
+            if restrictions is not None and i < len(restrictions):
+                axis_max = max(axis_max, restrictions[i])
+            axis_max = max(axis_max, initial_data[i])
+            if i < len(current_data):
+                axis_max = max(axis_max, current_data[i])
+            max_vals.append(axis_max * 1.1)
+        return max(max_vals)
+
+    def _template(self, initial_data, restrictions, show_both_lines):
+        """Шаблон фигуры с неизменной частью диаграммы"""
+        N = len(initial_data)
+        key = (tuple(initial_data), None if restrictions is None else tuple(restrictions), show_both_lines)
+        if key in self._templates:
+            self._templates.move_to_end(key)
+            return self._templates[key]
+
+        name, theta = radar_projection(N, 'polygon')
+        fig = Figure(figsize=(10, 10))
+        ax = fig.subplots(subplot_kw=dict(projection=name))
+        fig.subplots_adjust(top=0.85, bottom=0.05)
+
+        if restrictions is not None and len(restrictions) == N:
+            ax.plot(theta, restrictions, color='green', linewidth=2, linestyle='--',
+                    alpha=0.7, label="Предельные значения")
+        ax.plot(theta, initial_data, color='red', linewidth=2, label="Начальные условия")
+        current = None
+        if show_both_lines:
+            current, = ax.plot(theta, initial_data, color='blue', linewidth=2, label="Текущие характеристики")
+        ax.legend(loc='upper right', bbox_to_anchor=(1.3, 1.0), fontsize='small')
+
+        ax.set_varlabels(["Cf1", "Cf2", "Cf3", "Cf4", "Cf5"])
+
+        if restrictions is not None and len(restrictions) == N:
+            for i in range(N):
+                ax.text(theta[i], restrictions[i] * 1.02, f'{restrictions[i]:.2f}',
+                        color='green', fontsize=9, ha='center', va='bottom')
+
+        title = fig.text(0.5, 0.965, "",
+                         horizontalalignment='center',
+                         color='black',
+                         weight='bold',
+                         size='large',
+                         fontproperties={'family': 'DejaVu Sans', 'size': 12})
+
+        template = {"figure": fig, "axes": ax, "theta": theta, "current": current, "title": title}
+        self._templates[key] = template
+        while len(self._templates) > self.MAX_TEMPLATES:
+            self._templates.popitem(last=False)
+        return template
+
+    def _draw_from_template(self, filename, initial_data, current_data, title, restrictions, show_both_lines):
+        with self._lock:
+            template = self._template(initial_data, restrictions, show_both_lines)
+            if template["current"] is not None:
+                theta = template["theta"]
+                template["current"].set_data(np.append(theta, theta[0]),
+                                             np.append(current_data, current_data[0]))
+            template["axes"].set_ylim(0, self._axis_limit(initial_data, current_data, restrictions))
+            template["title"].set_text(title)
+            template["figure"].savefig(filename, bbox_inches='tight')
@@ -0,0 +1,347 @@
+# solvers.py
+# Интеграторы системы потерь по концентрации C
+import numpy as np
+
+from metrics import timed_import
+
+# scipy.integrate и scipy.interpolate импортируются при первом расчете
+
+# Доступные решатели: odeint (LSODA из ODEPACK) и методы solve_ivp
+SOLVERS = ("odeint", "RK45", "LSODA", "Radau", "BDF")
+# Точность по умолчанию - как у odeint
+DEFAULT_RTOL = 1.49012e-8
+DEFAULT_ATOL = 1.49012e-8
+# Предел числа перезапусков на событиях границ
+MAX_SEGMENTS = 1000
+# Неявные методы solve_ivp, которым нужна матрица Якоби
+IMPLICIT = ("LSODA", "Radau", "BDF")
+
+# Таблица Бутчера метода Дормана-Принса 5(4)
+_DP_C = [0.0, 1 / 5, 3 / 10, 4 / 5, 8 / 9, 1.0]
+_DP_A = [
+    [],
+    [1 / 5],
+    [3 / 40, 9 / 40],
+    [44 / 45, -56 / 15, 32 / 9],
+    [19372 / 6561, -25360 / 2187, 64448 / 6561, -212 / 729],
+    [9017 / 3168, -355 / 33, 46732 / 5247, 49 / 176, -5103 / 18656],
+]
+_DP_B = [35 / 384, 0.0, 500 / 1113, 125 / 192, -2187 / 6784, 11 / 84]
+# Разность решений 5-го и 4-го порядка (последний коэффициент - для k7 = f(C + h, y5))
+_DP_E = [71 / 57600, 0.0, -71 / 16695, 71 / 1920, -17253 / 339200, 22 / 525, -1 / 40]
+# Непрерывное продолжение 4-го порядка (как RK45.P в scipy): y(c + s·h) = y + h·Σ k_j·P_j(s)
+_DP_P = np.array([
+    [1, -8048581381 / 2820520608, 8663915743 / 2820520608, -12715105075 / 11282082432],
+    [0, 0, 0, 0],
+    [0, 131558114200 / 32700410799, -68118460800 / 10900136933, 87487479700 / 32700410799],
+    [0, -1754552775 / 470086768, 14199869525 / 1410260304, -10690763975 / 1880347072],
+    [0, 127303824393 / 49829197408, -318862633887 / 49829197408, 701980252875 / 199316789632],
+    [0, -282668133 / 205662961, 2019193451 / 616988883, -1453857185 / 822651844],
+    [0, 40617522 / 29380423, -110615467 / 29380423, 69997945 / 29380423],
+])
+
+
+def dopri_ensemble(rhs, y0, C, rtol=1e-10, atol=1e-10, max_steps=100000):
+    """
+    Пакетный метод Дормана-Принса 5(4) для N независимых систем.
+    У каждого сценария свой адаптивный шаг, поэтому изломы правой части
+    одного сценария не замедляют остальные; за итерацию выполняется
+    несколько операций над массивами [N x 5].
+    rhs(y, C) - правая часть (PendRHS.stack), C передается столбцом [N x 1]
+    C - возрастающая сетка концентраций, общая для всех сценариев
+    Значения в узлах сетки C берутся из непрерывного продолжения метода.
+    Возвращает массив [N x len(C) x 5]
+    """
+    C = np.asarray(C, dtype=float)
+    y = np.array(y0, dtype=float)
+    n = len(y)
+    out = np.empty((n, len(C), y.shape[-1]))
+    out[:, 0] = y
+    if len(C) < 2 or n == 0:
+        return out
+
+    span = C[-1] - C[0]
+    c = np.full(n, C[0])
+    h = np.full(n, span * 1e-2)
+    h_min = abs(span) * 1e-12
+    nxt = np.ones(n, dtype=int)
+    top = np.broadcast_to(rhs.top, y.shape)
+
+    active = np.arange(n)
+    part = rhs
+    f = part(y, c[:, None])
+
+    for _ in range(max_steps):
+        # Сценарии, дошедшие до конца сетки, исключаем из расчета
+        running = nxt[active] < len(C)
+        if not running.all():
+            keep = np.flatnonzero(running)
+            if len(keep) == 0:
+                break
+            active = active[keep]
+            part = rhs.subset(active)
+            y, c, h, f = y[keep], c[keep], h[keep], f[keep]
+
+        step = np.minimum(h, C[-1] - c)
+        hs = step[:, None]
+        k = [f]
+        for i in range(1, 6):
+            yi = y + hs * sum(a * kj for a, kj in zip(_DP_A[i], k))
+            k.append(part(yi, (c + _DP_C[i] * step)[:, None]))
+        y_new = y + hs * sum(b * kj for b, kj in zip(_DP_B, k))
+        f_new = part(y_new, (c + step)[:, None])
+        k.append(f_new)
+
+        error = hs * sum(e * kj for e, kj in zip(_DP_E, k))
+        scale = atol + rtol * np.maximum(np.abs(y), np.abs(y_new))
+        error_norm = np.sqrt(np.mean((error / scale) ** 2, axis=-1))
+        accept = (error_norm <= 1.0) | (step <= h_min)
+
+        # Правая часть обнуляет производную на границах; шаг не должен их перескакивать
+        top_rows = top[active]
+        y_new = np.minimum(y_new, np.maximum(y, top_rows))
+        y_new = np.maximum(y_new, np.minimum(y, rhs.eps))
+
+        if accept.any():
+            _fill_grid(out, C, active, nxt, accept, c, step, y, np.stack(k))
+            y = np.where(accept[:, None], y_new, y)
+            f = np.where(accept[:, None], f_new, f)
+            c = np.where(accept, c + step, c)
+
+        with np.errstate(divide="ignore"):
+            factor = 0.9 * error_norm ** -0.2
+        factor = np.where(accept, np.clip(factor, 0.2, 10.0), np.clip(factor, 0.1, 0.9))
+        h = np.maximum(step * factor, h_min)
+    else:
+        raise RuntimeError("Превышено число шагов интегрирования")
+
+    return out
+
+
+def _fill_grid(out, C, active, nxt, accept, c, step, y, k):
+    """Значения в узлах сетки, попавших в принятый шаг [c, c + step]"""
+    end = c + step
+    while True:
+        idx = nxt[active]
+        rows = np.flatnonzero(accept & (idx < len(C)))
+        if len(rows) == 0:
+            return
+        grid = C[np.minimum(idx[rows], len(C) - 1)]
+        rows = rows[grid <= end[rows] + 1e-12 * abs(C[-1] - C[0])]
+        if len(rows) == 0:
+            return
+        j = idx[rows]
+        h = step[rows]
+        s = np.clip((C[j] - c[rows]) / np.where(h > 0, h, 1.0), 0.0, 1.0)
+        weights = (s[:, None] ** np.arange(1, 5)) @ _DP_P.T
+        increment = np.einsum("rm,mrd->rd", weights, k[:, rows])
+        out[active[rows], j] = y[rows] + h[:, None] * increment
+        nxt[active[rows]] += 1
+
+
+def integrate(rhs, y0, C, solver="odeint", rtol=None, atol=None, analytic_jacobian=True):
+    """
+    Решение системы на сетке C выбранным решателем.
+    rhs - PendRHS одного сценария
+    odeint получает правую часть с обнулением производных на границах,
+    методы solve_ivp - гладкую правую часть и события выхода на границы.
+    analytic_jacobian - матрица Якоби из rhs.jacobian (Dfun/jac) вместо
+    конечных разностей (лишних вычислений правой части) у неявных методов.
+    Возвращает (решение [len(C) x 5], статистику решателя)
+    """
+    if solver not in SOLVERS:
+        raise ValueError(f"Неизвестный решатель: {solver}")
+    rtol = DEFAULT_RTOL if rtol is None else float(rtol)
+    atol = DEFAULT_ATOL if atol is None else float(atol)
+    C = np.asarray(C, dtype=float)
+
+    if solver == "odeint":
+        Dfun = rhs.jacobian if analytic_jacobian else None
+        odeint = timed_import("scipy.integrate").odeint
+        sol, info = odeint(rhs, y0, C, Dfun=Dfun, rtol=rtol, atol=atol, full_output=True)
+        stats = {
+            "nfev": int(info["nfe"][-1]),
+            "njev": int(info["nje"][-1]),
+            "nsteps": int(info["nst"][-1]),
+            "segments": 1,
+        }
+    else:
+        sol, stats = _integrate_with_events(rhs, y0, C, solver, rtol, atol,
+                                            analytic_jacobian and solver in IMPLICIT)
+
+    stats.update({"solver": solver, "rtol": rtol, "atol": atol})
+    return sol, stats
+
+
+def hermite_peaks(C, data, slopes):
+    """
+    Максимумы кубического эрмитова сплайна по значениям data [..., M, K] и производным
+    slopes [..., M, K] в узлах C [M] на каждом отрезке сетки: [..., M-1, K].
+    Учитываются концы отрезка и внутренние экстремумы (корни производной сплайна)
+    """
+    h = np.diff(C)[:, None]
+    y0, y1 = data[..., :-1, :], data[..., 1:, :]
+    m0, m1 = slopes[..., :-1, :] * h, slopes[..., 1:, :] * h
+    # p(s) = y0 + a1·s + a2·s² + a3·s³, s = (C - C_j) / h на [0, 1]
+    a1 = m0
+    a2 = 3 * (y1 - y0) - 2 * m0 - m1
+    a3 = 2 * (y0 - y1) + m0 + m1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Корни 3·a3·s² + 2·a2·s + a1 (устойчивая форма; NaN - корня нет)
+        q = -(a2 + np.where(a2 >= 0, 1.0, -1.0) * np.sqrt(a2 ** 2 - 3 * a1 * a3))
+        peaks = np.maximum(y0, y1)
+        for s in (q / (3 * a3), a1 / q):
+            s = np.clip(s, 0.0, 1.0)
+            peaks = np.fmax(peaks, y0 + s * (a1 + s * (a2 + s * a3)))
+    return peaks
+
+
+def restriction_crossings(rhs, C, data, restrictions, slopes=None):
+    """
+    Точки C*, где Cf_i впервые достигает ограничения restrictions[i].
+    Решение между узлами продолжается кубическим эрмитовым сплайном из значений
+    решения и производных rhs в узлах (rhs вызывается один раз для всей сетки,
+    C - столбцом); первый отрезок, на котором максимум сплайна (hermite_peaks)
+    достигает ограничения, дает C* как первый корень сплайна на нем. Поэтому
+    точность не зависит от шага сетки C, из нескольких пересечений внутри
+    отрезка выбирается первое, а выход за ограничение между узлами не теряется.
+    slopes - уже вычисленные производные в узлах (тогда rhs не нужна).
+    Если ограничение выполнено уже в начале, C* = C[0]; если не достигнуто
+    (или не задано) - NaN.
+    """
+    C = np.asarray(C, dtype=float)
+    data = np.asarray(data, dtype=float)
+    if slopes is None:
+        slopes = rhs(data, C[:, None])
+    slopes = np.asarray(slopes, dtype=float)
+    limits = np.asarray(restrictions, dtype=float)[:data.shape[1]]
+    peaks = hermite_peaks(C, data, slopes)
+    crossings = np.full(data.shape[1], np.nan)
+    for i, limit in enumerate(limits):
+        if data[0, i] >= limit:
+            crossings[i] = C[0]
+            continue
+        above = np.flatnonzero(peaks[:, i] >= limit)
+        if len(above) == 0:
+            continue
+        j = above[0]
+        spline = timed_import("scipy.interpolate").CubicHermiteSpline(C[j:j + 2], data[j:j + 2, i], slopes[j:j + 2, i])
+        roots = spline.solve(limit, extrapolate=False)
+        crossings[i] = roots[0] if len(roots) else C[j + 1]
+    return crossings
+
+
+def _integrate_with_events(rhs, y0, C, method, rtol, atol, analytic_jacobian=False):
+    """
+    solve_ivp с событиями на границах [eps, top].
+    Переменная, дошедшая до границы, замораживается (ее производная равна 0)
+    и освобождается, когда производная меняет знак внутрь области.
+    На каждом событии расчет перезапускается с новым набором замороженных переменных.
+    """
+    y = np.array(y0, dtype=float)
+    top = np.broadcast_to(rhs.top, y.shape)
+    eps = rhs.eps
+    out = np.empty((len(C), len(y)))
+    out[0] = y
+    stats = {"nfev": 0, "njev": 0, "nsteps": 0, "segments": 0}
+
+    # Начальное состояние: на границе или за ней и производная направлена наружу
+    d = rhs.derivatives(y, C[0])
+    frozen = ((y >= top) & (d > 0)) | ((y <= eps) & (d < 0))
+
+    # События проверяются на концах шагов: при событиях по знаку производной
+    # шаг не длиннее шага сетки, чтобы не пропустить ее кратковременную смену
+    # (для неравномерной сетки - среднего шага: сгущения не должны замедлять весь расчет)
+    grid_step = (C[-1] - C[0]) / (len(C) - 1)
+
+    c = C[0]
+    filled = 1
+    while filled < len(C):
+        if stats["segments"] >= MAX_SEGMENTS:
+            raise RuntimeError("Превышено число перезапусков интегрирования")
+        stats["segments"] += 1
+
+        free = (~frozen).astype(float)
+
+        def f(t, x):
+            return rhs.derivatives(x, t) * free
+
+        options = {}
+        if analytic_jacobian:
+            options["jac"] = lambda t, x: rhs.derivatives_jacobian(x, t) * free[:, None]
+
+        events, actions, watch_sign = _boundary_events(rhs, y, top, eps, frozen)
+        max_step = grid_step if watch_sign else np.inf
+        solve_ivp = timed_import("scipy.integrate").solve_ivp
+        sol = solve_ivp(f, (c, C[-1]), y, method=method, rtol=rtol, atol=atol,
+                        events=events or None, dense_output=True, max_step=max_step, **options)
+        if not sol.success:
+            raise RuntimeError(sol.message)
+        stats["nfev"] += int(sol.nfev)
+        stats["njev"] += int(sol.njev)
+        stats["nsteps"] += len(sol.t) - 1
+
+        end = sol.t[-1]
+        upto = filled + int(np.searchsorted(C[filled:], end, side="right"))
+        if upto > filled:
+            out[filled:upto] = sol.sol(C[filled:upto]).T
+        filled = upto
+
+        y = sol.y[:, -1].copy()
+        frozen = frozen.copy()
+        for j, times in enumerate(sol.t_events or []):
+            if len(times):
+                i, freeze, level = actions[j]
+                frozen[i] = freeze
+                if level is not None:
+                    # Переменная, дошедшая до границы, ставится ровно на нее
+                    y[i] = level
+        c = end
+
+    return out, stats
+
+
+def _boundary_events(rhs, y, top, eps, frozen):
+    """
+    Терминальные события для solve_ivp на очередной отрезок.
+    Для каждого события - (номер переменной, заморозить ли ее, граница или None);
+    третье значение - есть ли события по знаку производной
+    """
+    events = []
+    actions = []
+    watch_sign = False
+    for i in range(len(y)):
+        upper = y[i] >= top[i]
+        if frozen[i]:
+            # Освобождение: производная повернула внутрь области
+            events.append(_derivative_event(rhs, i, -1.0 if upper else 1.0))
+            actions.append((i, False, None))
+            watch_sign = True
+        elif y[i] > top[i] or y[i] < eps:
+            # Начальное значение вне области: заморозка, когда производная повернет наружу,
+            # или возврат в область через границу
+            level = top[i] if upper else eps
+            events += [_derivative_event(rhs, i, 1.0 if upper else -1.0),
+                       _level_event(i, level, -1.0 if upper else 1.0)]
+            actions += [(i, True, None), (i, False, level)]
+            watch_sign = True
+        else:
+            events += [_level_event(i, top[i], 1.0), _level_event(i, eps, -1.0)]
+            actions += [(i, True, top[i]), (i, True, eps)]
+    for event in events:
+        event.terminal = True
+    return events, actions, watch_sign
+
+
+def _level_event(i, level, direction):
+    def event(t, x):
+        return x[i] - level
+    event.direction = direction
+    return event
+
+
+def _derivative_event(rhs, i, direction):
+    def event(t, x):
+        return rhs.derivatives(x, t)[i]
+    event.direction = direction
+    return event
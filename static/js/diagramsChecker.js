@@ -1,4 +1,12 @@
 const status = sessionStorage.getItem("status")
+const artifacts = JSON.parse(sessionStorage.getItem("artifacts") || "{}")
+
+// Адрес картинки последнего расчета (или статический файл)
+function artifactUrl(src) {
+    const path = src.split('?')[0]
+    const name = path.split('/').pop()
+    return artifacts[name] || path
+}
 const grid = document.querySelector('#diagrams-grid')
 
 if (status !== "Выполнено") {
@@ -25,7 +33,7 @@ if (status !== "Выполнено") {
             }
             
           
-            img.src = img.src.split('?')[0] + '?t=' + new Date().getTime()
+            img.src = artifactUrl(img.src)
         }
     })
 }
\ No newline at end of file
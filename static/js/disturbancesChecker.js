@@ -1,4 +1,12 @@
 const status = sessionStorage.getItem("status")
+const artifacts = JSON.parse(sessionStorage.getItem("artifacts") || "{}")
+
+// Адрес картинки последнего расчета (или статический файл)
+function artifactUrl(src) {
+    const path = src.split('?')[0]
+    const name = path.split('/').pop()
+    return artifacts[name] || path
+}
 const element = document.getElementById("disturbances-image")
 const container = document.getElementById("disturbances-container")
 
@@ -26,5 +34,5 @@ if (status !== "Выполнено") {
         `
     }
 
-    element.src = element.src.split('?')[0] + '?t=' + new Date().getTime()
+    element.src = artifactUrl(element.src)
 }
\ No newline at end of file
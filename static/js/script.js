@@ -486,11 +486,20 @@ async function process() {
 
         const result = await response.json()
         input.value = result.status + " (t=" + timeValue + ")"
-        sessionStorage.setItem("status", result.status)
-        
-        setTimeout(() => {
+        if (!result.job_id) {
+            sessionStorage.setItem("status", result.status)
+            return
+        }
+
+        // Ждем окончания расчета и только потом обновляем страницу
+        const job = await waitForJob(result.job_url, timeValue)
+        sessionStorage.setItem("status", job.status)
+        if (job.artifacts) {
+            sessionStorage.setItem("artifacts", JSON.stringify(job.artifacts))
+        }
+        if (job.state === "done") {
             window.location.reload()
-        }, 1000)
+        }
     } catch (error) {
         input.value = "Ошибка соединения"
         console.error("Error:", error)
@@ -504,4 +513,18 @@ if (timeInput) {
     if (savedTime) {
         timeInput.value = savedTime
     }
-}
\ No newline at end of file
+}
+
+async function waitForJob(url, timeValue) {
+    let delay = 250
+    while (true) {
+        const response = await fetch(url)
+        const job = await response.json()
+        input.value = job.status + " (t=" + timeValue + ")"
+        if (job.state === "done" || job.state === "error" || !response.ok) {
+            return job
+        }
+        await new Promise(resolve => setTimeout(resolve, delay))
+        delay = Math.min(delay * 2, 2000)
+    }
+}
@@ -0,0 +1,47 @@
+# tests/test_cache.py
+# Кэш картинок на диске: картинку, записанную одним процессом, находят остальные
+import hashlib
+
+from cache import ImageCache
+
+
+def digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def test_image_shared_between_caches(tmp_path):
+    writer, reader = ImageCache(directory=tmp_path), ImageCache(directory=tmp_path)
+    writer.put(digest(b"a"), b"png a")
+    assert digest(b"a") in reader
+    assert reader.get(digest(b"a")) == b"png a"
+    assert reader.get(digest(b"b")) is None
+    assert reader.stats()["hits"] == 1 and reader.stats()["misses"] == 1
+
+
+def test_peek_does_not_count(tmp_path):
+    cache = ImageCache(directory=tmp_path)
+    cache.put(digest(b"a"), b"png a")
+    assert cache.peek(digest(b"a")) == b"png a"
+    assert cache.stats()["hits"] == 0 and cache.stats()["misses"] == 0
+
+
+def test_invalid_digest_is_not_a_path(tmp_path):
+    cache = ImageCache(directory=tmp_path)
+    assert cache.get("../secret") is None
+    assert "../secret" not in cache
+
+
+def test_disk_budget(tmp_path):
+    cache = ImageCache(directory=tmp_path, disk_bytes=30)
+    for k in range(5):
+        cache.put(digest(bytes([k])), b"0123456789")
+    assert cache.stats()["disk_bytes"] <= 30
+    # В памяти картинки остаются и после вытеснения с диска
+    assert cache.get(digest(bytes([0]))) == b"0123456789"
+
+
+def test_memory_only_without_directory():
+    cache = ImageCache()
+    cache.put(digest(b"a"), b"png a")
+    assert cache.get(digest(b"a")) == b"png a"
+    assert cache.stats()["disk_images"] == 0
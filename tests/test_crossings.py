@@ -0,0 +1,77 @@
+# tests/test_crossings.py
+# Точки достижения ограничений на кривых с известными пересечениями
+import numpy as np
+import pytest
+
+from solvers import hermite_peaks, restriction_crossings
+
+C = np.linspace(0.0, 1.0, 11)
+
+
+class KnownRHS:
+    """Правая часть для заданных многочленами траекторий: производные в узлах C-столбца (x не используется)"""
+
+    def __init__(self, curves):
+        self.curves = [np.polynomial.Polynomial(coef) for coef in curves]
+
+    def trajectory(self, C):
+        return np.stack([curve(C) for curve in self.curves], axis=-1)
+
+    def __call__(self, x, C):
+        return np.concatenate([curve.deriv()(C) for curve in self.curves], axis=-1)
+
+
+def crossings(curves, restrictions):
+    rhs = KnownRHS(curves)
+    return restriction_crossings(rhs, C, rhs.trajectory(C), restrictions)
+
+
+def test_crossing_exactly_at_grid_node():
+    # Cf = C достигает 0.5 ровно в узле C[5]
+    assert crossings([[0.0, 1.0]], [0.5])[0] == pytest.approx(0.5, abs=1e-12)
+
+
+def test_crossing_inside_interval():
+    # Cf = C² достигает 0.3 при C = sqrt(0.3), между узлами 0.5 и 0.6
+    assert crossings([[0.0, 0.0, 1.0]], [0.3])[0] == pytest.approx(np.sqrt(0.3), abs=1e-12)
+
+
+def test_no_crossing():
+    result = crossings([[0.2, 0.1], [0.2, 0.1], [0.2, 0.1]], [0.9, None, np.nan])
+    assert np.isnan(result).all()
+
+
+def test_limit_exceeded_at_start():
+    assert crossings([[0.8, -0.1]], [0.5])[0] == C[0]
+
+
+@pytest.mark.parametrize("roots", [[0.32, 0.35, 0.38], [0.31, 0.33, 0.395], [0.302, 0.38, 0.398]])
+def test_first_of_several_crossings_in_one_interval(roots):
+    # Cf = 0.5 + 100·(C - r1)(C - r2)(C - r3): три пересечения внутри [0.3, 0.4],
+    # в узлах 0.3 - ниже ограничения, 0.4 - выше; C* - первое из них
+    curve = np.polynomial.Polynomial.fromroots(roots) * 100 + 0.5
+    assert crossings([curve.coef], [0.5])[0] == pytest.approx(roots[0], abs=1e-12)
+
+
+def test_each_output_independently():
+    result = crossings([[0.0, 1.0], [0.0, 0.0, 1.0], [0.2]], [0.5, 0.3, 0.9])
+    np.testing.assert_allclose(result[:2], [0.5, np.sqrt(0.3)], atol=1e-12)
+    assert np.isnan(result[2])
+
+
+def test_crossing_between_nodes_below_limit():
+    # Cf = 0.5 - 100·(C - 0.33)(C - 0.37): максимум 0.54 при C = 0.35, в узлах 0.3 и 0.4 - 0.29
+    curve = 0.5 - np.polynomial.Polynomial.fromroots([0.33, 0.37]) * 100
+    assert crossings([curve.coef], [0.5])[0] == pytest.approx(0.33, abs=1e-12)
+    assert np.isnan(crossings([curve.coef], [0.55])[0])
+
+
+def test_hermite_peaks_match_dense_cubic():
+    # Для кубических траекторий сплайн совпадает с траекторией: максимум на отрезке - по плотной сетке
+    rng = np.random.default_rng(0)
+    rhs = KnownRHS(rng.normal(size=(5, 4)))
+    data = rhs.trajectory(C)
+    peaks = hermite_peaks(C, data, rhs(data, C[:, None]))
+    dense = np.linspace(0.0, 1.0, 100001)
+    expected = rhs.trajectory(dense)[:-1].reshape(10, -1, 5).max(axis=1)
+    np.testing.assert_allclose(peaks, np.maximum(expected, data[1:]), atol=1e-9)
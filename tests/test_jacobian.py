@@ -0,0 +1,83 @@
+# tests/test_jacobian.py
+# Аналитическая матрица Якоби PendRHS против центральных разностей
+import numpy as np
+import pytest
+
+from functions import PendRHS
+from benchmarks.payloads import default_payload, random_payload, as_floats, random_states
+
+XM = [1.0, 1.0, 1.0, 1.0, 1.0]
+H = 1e-7
+
+
+def scenarios(count=8, seed=0):
+    rng = np.random.default_rng(seed)
+    payloads = [default_payload()] + [random_payload(rng) for _ in range(count - 1)]
+    result = []
+    for payload in payloads:
+        _, faks, equations, _, t = as_floats(payload)
+        result.append(PendRHS(faks, equations, XM, t))
+    return result
+
+
+def differences(func, x, C, outward=None):
+    """
+    Матрица производных func по x: центральные разности, а для переменных
+    на границе (outward = +1 у верхней, -1 у нижней) - односторонние наружу
+    """
+    jac = np.empty((5, 5))
+    for j in range(5):
+        step = np.zeros(5)
+        step[j] = H
+        side = 0 if outward is None else outward[j]
+        if side == 0:
+            jac[:, j] = (func(x + step, C) - func(x - step, C)) / (2 * H)
+        elif side > 0:
+            jac[:, j] = (func(x + step, C) - func(x, C)) / H
+        else:
+            jac[:, j] = (func(x, C) - func(x - step, C)) / H
+    return jac
+
+
+@pytest.mark.parametrize("rhs", scenarios())
+def test_derivatives_jacobian_matches_central_differences(rhs):
+    rng = np.random.default_rng(1)
+    for x, c in zip(*random_states(rng, 200)):
+        np.testing.assert_allclose(rhs.derivatives_jacobian(x, c), differences(rhs.derivatives, x, c),
+                                   atol=1e-6, rtol=1e-5)
+
+
+@pytest.mark.parametrize("rhs", scenarios())
+def test_jacobian_matches_differences_inside(rhs):
+    rng = np.random.default_rng(2)
+    for x, c in zip(*random_states(rng, 200)):
+        x = np.clip(x, 2 * rhs.eps, rhs.top - rhs.eps)
+        np.testing.assert_allclose(rhs.jacobian(x, c), differences(rhs, x, c), atol=1e-6, rtol=1e-5)
+
+
+@pytest.mark.parametrize("rhs", scenarios())
+def test_jacobian_on_boundary_states(rhs):
+    """Переменные на границах: строки с обрезанной производной нулевые, остальные - как разности"""
+    rng = np.random.default_rng(3)
+    clamped_rows = 0
+    for x, c in zip(*random_states(rng, 200)):
+        outward = rng.choice([-1, 0, 1], 5)
+        x = np.where(outward > 0, rhs.top, np.where(outward < 0, rhs.eps, x))
+        jac = rhs.jacobian(x, c)
+        d = rhs.derivatives(x, c)
+        clamped = ((x >= rhs.top) & (d > 0)) | ((x <= rhs.eps) & (d < 0))
+        clamped_rows += clamped.sum()
+        assert np.all(jac[clamped] == 0.0)
+        np.testing.assert_allclose(jac[~clamped], rhs.derivatives_jacobian(x, c)[~clamped])
+        # Разности берутся наружу: по эту сторону границы обрезка не меняется
+        np.testing.assert_allclose(jac, differences(rhs, x, c, outward), atol=1e-6, rtol=1e-5)
+    assert clamped_rows > 0
+
+
+def test_stacked_jacobian_matches_members():
+    members = scenarios(4, seed=5)
+    stacked = PendRHS.stack(members)
+    rng = np.random.default_rng(4)
+    x, c = rng.uniform(0, 1, (4, 5)), rng.uniform(0, 1, (4, 1))
+    expected = np.array([rhs.jacobian(xi, ci[0]) for rhs, xi, ci in zip(members, x, c)])
+    np.testing.assert_allclose(stacked.jacobian(x, c), expected)
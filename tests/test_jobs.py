@@ -0,0 +1,46 @@
+# tests/test_jobs.py
+# Очередь заданий: состояние задания видно другой очереди на том же каталоге
+import time
+
+from jobs import DONE, FAILED, JobQueue
+
+
+def wait(queue, job_id, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job is not None and job["status"] in (DONE, FAILED):
+            return job
+        time.sleep(0.01)
+    raise AssertionError("Задание не завершилось")
+
+
+def test_job_visible_from_other_queue(tmp_path):
+    owner, other = JobQueue(directory=tmp_path), JobQueue(directory=tmp_path)
+    job_id = owner.submit(lambda a, b: {"sum": a + b}, 2, 3)
+    job = wait(other, job_id)
+    assert job["status"] == DONE and job["result"] == {"sum": 5}
+    assert other.get("0" * 32) is None
+    assert other.get("../x") is None
+    owner.shutdown()
+
+
+def test_failed_job_visible_from_other_queue(tmp_path):
+    owner, other = JobQueue(directory=tmp_path), JobQueue(directory=tmp_path)
+
+    def fail():
+        raise ValueError("плохие параметры")
+
+    job = wait(other, owner.submit(fail))
+    assert job["status"] == FAILED and job["error"] == "плохие параметры"
+    owner.shutdown()
+
+
+def test_disk_keeps_last_jobs(tmp_path):
+    queue = JobQueue(max_jobs=3, directory=tmp_path)
+    ids = [queue.submit(lambda k=k: k) for k in range(6)]
+    for job_id in ids:
+        wait(queue, job_id)
+    queue.submit(lambda: None)
+    queue.shutdown()
+    assert len(list(tmp_path.glob("*.json"))) <= 4
@@ -0,0 +1,33 @@
+# tests/test_optimization.py
+# Проверка допустимости кандидатов в evaluate: выход за ограничение между узлами C
+import numpy as np
+
+from functions import PendRHS
+from optimization import evaluate
+from parameters import flatten
+from solvers import integrate
+from benchmarks.payloads import random_payload, as_floats
+
+XM = [1.0, 1.0, 1.0, 1.0, 1.0]
+
+
+def test_violation_between_grid_nodes():
+    # Cf5 этого сценария достигает максимума при C ≈ 0.94, между узлами 0.8 и 1.0 сетки C;
+    # ограничение - между максимумом в узлах и настоящим максимумом
+    initial, faks, equations, _, t = as_floats(random_payload(np.random.default_rng(1)))
+    rhs = PendRHS(faks, equations, XM, t)
+    C = np.linspace(0.0, 1.0, 6)
+    dense = np.linspace(0.0, 1.0, 20001)
+    exact = integrate(rhs, initial, dense, "LSODA", 1e-11, 1e-11)[0][:, 4]
+    nodes = integrate(rhs, initial, C, "LSODA", 1e-11, 1e-11)[0][:, 4]
+    assert exact.argmax() not in np.searchsorted(dense, C)
+    limit = (exact.max() + nodes.max()) / 2
+    limits = np.array([np.inf] * 4 + [limit])
+
+    loss, violated_at, _, _ = evaluate(np.array([flatten(faks, equations)]), initial, t, C, XM, limits, chunks=1)
+    assert np.isinf(loss[0])
+    assert abs(violated_at[0] - dense[np.argmax(exact >= limit)]) < 1e-3
+
+    loss, violated_at, _, _ = evaluate(np.array([flatten(faks, equations)]), initial, t, C, XM,
+                                       np.array([np.inf] * 4 + [exact.max() + 1e-4]), chunks=1)
+    assert np.isfinite(loss[0]) and np.isnan(violated_at[0])
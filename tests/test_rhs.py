@@ -0,0 +1,85 @@
+# tests/test_rhs.py
+# PendRHS и таблица возмущений против исходных pend и fx_linear
+import numpy as np
+import pytest
+
+from functions import PendRHS, DisturbanceTable, fx_linear, pend
+from benchmarks.payloads import default_payload, random_payload, as_floats
+
+XM = [1.0, 1.0, 1.0, 1.0, 1.0]
+
+
+def damaged(faks, equations, rng):
+    """
+    Случайная порча параметров: нехватка строк faks, короткие и пустые строки,
+    нулевые коэффициенты возмущений и внутренних функций
+    """
+    faks = [list(row) for row in faks[:rng.integers(0, 15)]]
+    for row in faks:
+        kind = rng.integers(0, 6)
+        if kind == 0:
+            del row[rng.integers(0, 2):]
+        elif kind == 1:
+            row[:] = [0.0, 0.0]
+        elif kind == 2:
+            row[rng.integers(0, 2)] = 0.0
+    equations = [list(row) for row in equations]
+    for row in equations:
+        kind = rng.integers(0, 5)
+        if kind == 0:
+            del row[rng.integers(0, len(row) + 1):]
+        elif kind == 1:
+            row[:] = [0.0] * len(row)
+    return faks, equations
+
+
+def cases(count=30, seed=0):
+    rng = np.random.default_rng(seed)
+    result = []
+    for k in range(count):
+        payload = default_payload() if k == 0 else random_payload(rng)
+        _, faks, equations, _, t = as_floats(payload)
+        if k >= count // 2:
+            faks, equations = damaged(faks, equations, rng)
+        result.append((faks, equations, t))
+    return result
+
+
+def states(rng, count=100):
+    """Состояния, в том числе вне [0, 1], и концентрации на [0, 1] вместе с границами"""
+    x = rng.uniform(-0.5, 1.5, (count, 5))
+    x[::4] = rng.uniform(0.0, 1.0, (len(x[::4]), 5))
+    C = rng.uniform(0.0, 1.0, count)
+    C[:2] = 0.0, 1.0
+    return x, C
+
+
+@pytest.mark.parametrize("faks, equations, t", cases())
+def test_rhs_matches_pend(faks, equations, t):
+    rng = np.random.default_rng(1)
+    rhs = PendRHS(faks, equations, XM, t)
+    for x, c in zip(*states(rng)):
+        np.testing.assert_allclose(rhs(x, c), pend(x, c, faks, equations, XM, t), rtol=1e-12, atol=1e-12)
+
+
+@pytest.mark.parametrize("faks, equations, t", cases())
+def test_table_levels_match_fx_linear(faks, equations, t):
+    """Интерполяция таблицы по изломам точна: уровни x1-x14 как у fx_linear (незаданные - 0)"""
+    C = np.linspace(0.0, 1.0, 257)
+    levels = DisturbanceTable(faks, t).levels_at(C)
+    for k in range(14):
+        given = k < len(faks) and len(faks[k]) >= 2
+        argument = t if k < 6 else C
+        expected = [fx_linear(value, faks[k]) if given else 0.0 for value in np.broadcast_to(argument, C.shape)]
+        np.testing.assert_allclose(levels[:, k], expected, rtol=1e-12, atol=1e-12)
+
+
+def test_stacked_rhs_matches_pend():
+    """Пакет из stack (разные t и параметры) дает то же, что pend для каждого сценария"""
+    scenarios = cases(12, seed=2)
+    stacked = PendRHS.stack([PendRHS(faks, equations, XM, t) for faks, equations, t in scenarios])
+    rng = np.random.default_rng(3)
+    x, C = states(rng, len(scenarios))
+    expected = np.array([pend(xi, ci, faks, equations, XM, t)
+                         for xi, ci, (faks, equations, t) in zip(x, C, scenarios)])
+    np.testing.assert_allclose(stacked(x, C[:, None]), expected, rtol=1e-12, atol=1e-12)
@@ -0,0 +1,57 @@
+# tests/test_solvers.py
+# Пакетный Дорман-Принс против integrate на отдельных сценариях
+import numpy as np
+import pytest
+
+from functions import PendRHS
+from solvers import dopri_ensemble, integrate
+from benchmarks.payloads import default_payload, random_payload, as_floats
+
+XM = [1.0, 1.0, 1.0, 1.0, 1.0]
+C = np.linspace(0.0, 1.0, 101)
+# Расхождение с эталоном при rtol = atol = 1e-10 у обоих решателей
+TOLERANCE = 1e-7
+
+
+def scenarios():
+    """Сценарии (начальные значения, faks, equations, t): типовые, испорченный и с выходом на границу"""
+    rng = np.random.default_rng(0)
+    result = []
+    for payload in [default_payload()] + [random_payload(rng) for _ in range(5)]:
+        initial, faks, equations, _, t = as_floats(payload)
+        result.append((initial, faks, equations, t))
+    initial, faks, equations, _, _ = as_floats(default_payload())
+    # Нет строк faks после x9, короткая строка x10, нулевые и пустые параметры функций
+    result.append((initial, faks[:9] + [[0.3]], [[], [0.0, 0.0], equations[2], [0.7]] + equations[4:8], 0.25))
+    # Cf1 доходит до верхней границы и остается на ней
+    result.append(([0.95, 0.9, 0.93, 0.82, 0.62], [[0.7, 1.8]] * 7 + [[0.0, 0.0]] * 7, equations, 0.5))
+    return result
+
+
+def reference(initial, faks, equations, t):
+    """LSODA с событиями на границах: выход на границу обрабатывается точно"""
+    return integrate(PendRHS(faks, equations, XM, t), initial, C, "LSODA", 1e-10, 1e-10)[0]
+
+
+@pytest.mark.parametrize("initial, faks, equations, t", scenarios())
+def test_single_scenario_matches_integrate(initial, faks, equations, t):
+    trajectory = dopri_ensemble(PendRHS.stack([PendRHS(faks, equations, XM, t)]), [initial], C,
+                                rtol=1e-10, atol=1e-10)[0]
+    np.testing.assert_allclose(trajectory, reference(initial, faks, equations, t), rtol=0, atol=TOLERANCE)
+
+
+def test_batch_matches_single_scenarios():
+    """Пакет из всех сценариев сразу: у каждого свой шаг, результат как по отдельности"""
+    cases = scenarios()
+    rhs = PendRHS.stack([PendRHS(faks, equations, XM, t) for _, faks, equations, t in cases])
+    trajectories = dopri_ensemble(rhs, [initial for initial, _, _, _ in cases], C, rtol=1e-10, atol=1e-10)
+    for trajectory, case in zip(trajectories, cases):
+        np.testing.assert_allclose(trajectory, reference(*case), rtol=0, atol=TOLERANCE)
+
+
+def test_saturating_scenario_stays_on_boundary():
+    initial, faks, equations, t = scenarios()[-1]
+    rhs = PendRHS(faks, equations, XM, t)
+    trajectory = dopri_ensemble(PendRHS.stack([rhs]), [initial], C, rtol=1e-10, atol=1e-10)[0]
+    assert trajectory[-1, 0] == pytest.approx(rhs.top[0], abs=1e-9)
+    assert np.all(trajectory <= rhs.top + 1e-12)